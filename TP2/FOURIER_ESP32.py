@@ -1,6 +1,6 @@
-from machine import DAC, Pin
+from machine import DAC, Pin, Timer
 import math
-import time
+from array import array
 
 # Configuración del DAC (GPIO26 = DAC1)
 dac = DAC(Pin(26))
@@ -8,29 +8,98 @@ dac = DAC(Pin(26))
 # Parámetros de la onda
 frecuencia_base = 1000  # Hz
 muestras_por_ciclo = 100
+# Frecuencia del timer que actualiza el DAC (DDS). En el ESP32 el callback del
+# Timer es una función Python que corre agendada (soft IRQ): cada llamada
+# cuesta decenas de us, así que por encima de unos 5 kHz las llamadas se
+# acumulan, la cola del scheduler se llena y el REPL deja de responder.
+# Con 4 kHz queda margen. El DDS da la frecuencia exacta (resolución
+# fs_dac / 2**24 Hz) pero con fs_dac / f muestras por ciclo: a 1 kHz son 4,
+# y todo armónico por encima de fs_dac / 2 se repliega. avisar_muestreo()
+# lo avisa y dice el N máximo que se reproduce sin aliasing.
+fs_dac = 4000           # Hz
+MIN_MUESTRAS_POR_CICLO = 8
 
-def generar_onda_cuadrada_fourier(N, frecuencia):
+class SintetizadorFourier:
     """
-    Genera una onda cuadrada mediante la suma de armónicos impares
-    hasta el N-ésimo, normalizada para el DAC.
+    Síntesis incremental de la serie de Fourier de la onda cuadrada.
+    - La tabla base sin(2*pi*n/M) se genera una sola vez por rotación de
+      un fasor (un solo par cos/sin), y el armónico k en la muestra n es
+      base[(k*n) % M]: no se llama a sin() por muestra.
+    - Se guarda la suma parcial del último N: pasar de N=31 a N=33 solo
+      suma el armónico 33 (y bajar de N resta los que sobran).
+    - Las tablas normalizadas de 8 bits se guardan en un LRU chico.
+    Como se sintetiza exactamente un ciclo, la forma solo depende de N;
+    la frecuencia la fija el reproductor.
     """
-    T = 1 / frecuencia
-    dt = T / muestras_por_ciclo
-    onda = []
-    for n in range(muestras_por_ciclo):
-        t = n * dt
-        valor = sum((1 / k) * math.sin(math.tau * k * frecuencia * t)
-                    for k in range(1, N + 1, 2))
-        onda.append(valor)
-
-    # Normalización a rango 0-255 para DAC
-    max_val = max(onda)
-    min_val = min(onda)
-    onda_normalizada = [
-        int((val - min_val) / (max_val - min_val) * 255)
-        for val in onda
-    ]
-    return onda_normalizada, dt
+    def __init__(self, muestras, max_tablas=4):
+        self.M = muestras
+        self.max_tablas = max_tablas
+        self.base = array('f', [0] * muestras)
+        c = math.cos(math.tau / muestras)
+        s = math.sin(math.tau / muestras)
+        x = 1.0
+        y = 0.0
+        for n in range(muestras):
+            self.base[n] = y
+            x, y = x * c - y * s, x * s + y * c
+        self.suma = array('f', [0] * muestras)
+        self.N = 0           # último armónico incluido en self.suma
+        self.tablas = {}     # N -> bytearray normalizada
+        self.orden = []      # claves del LRU, la más reciente al final
+
+    def _armonico(self, k, signo):
+        M = self.M
+        base = self.base
+        suma = self.suma
+        amp = signo / k
+        paso = k % M
+        idx = 0
+        for n in range(M):
+            suma[n] += amp * base[idx]
+            idx += paso
+            if idx >= M:
+                idx -= M
+
+    def _ajustar(self, N):
+        """Lleva la suma parcial de self.N a N sumando o restando armónicos impares."""
+        while self.N < N:
+            self.N += 1 if self.N == 0 else 2
+            self._armonico(self.N, 1)
+        while self.N > N:
+            self._armonico(self.N, -1)
+            self.N -= 2 if self.N > 1 else 1
+
+    def tabla(self, N):
+        """Devuelve la tabla de un ciclo normalizada a 0-255 para N armónicos."""
+        tabla = self.tablas.get(N)
+        if tabla is not None:
+            self.orden.remove(N)
+            self.orden.append(N)
+            return tabla
+
+        self._ajustar(N)
+        suma = self.suma
+        max_val = max(suma)
+        min_val = min(suma)
+        escala = 255 / (max_val - min_val)
+        tabla = bytearray(self.M)
+        for n in range(self.M):
+            tabla[n] = int((suma[n] - min_val) * escala)
+
+        self.tablas[N] = tabla
+        self.orden.append(N)
+        if len(self.orden) > self.max_tablas:
+            del self.tablas[self.orden.pop(0)]
+        return tabla
+
+sintetizador = SintetizadorFourier(muestras_por_ciclo)
+
+def generar_onda_cuadrada_fourier(N):
+    """
+    Genera un ciclo de onda cuadrada mediante la suma de armónicos impares
+    hasta el N-ésimo, normalizado para el DAC.
+    """
+    return sintetizador.tabla(N)
 
 def graficar_onda_ascii(onda, alto=20, ancho=80):
     """
@@ -50,9 +119,104 @@ def graficar_onda_ascii(onda, alto=20, ancho=80):
             linea += '.' if punto == nivel else ' '
         print(linea)
 
+class ReproductorDDS:
+    """
+    Reproductor por síntesis digital directa (DDS): un timer de hardware
+    actualiza el DAC a fs fijo y un acumulador de fase de 24 bits recorre
+    una tabla de un ciclo de 256 muestras. El incremento de fase
+    (f * 2**24 / fs) fija la frecuencia con resolución fs / 2**24 Hz, así
+    que cambiarla no requiere regenerar la tabla. Se reproduce en segundo
+    plano y el REPL queda libre (con fs dentro de lo que aguanta el timer,
+    ver fs_dac).
+    """
+    BITS_FASE = 24
+    BITS_TABLA = 8
+
+    def __init__(self, dac, fs, timer_id=0):
+        self.dac = dac
+        self.fs = fs
+        self.tabla = bytearray(1 << self.BITS_TABLA)
+        self.fase = 0
+        self.incremento = 0
+        self.frecuencia = 0
+        self.activo = False
+        self._escribir = dac.write
+        self._cb = self._tick  # método ligado guardado: el IRQ no asigna memoria
+        self.timer = Timer(timer_id)
+
+    def cargar(self, onda):
+        """
+        Copia un ciclo de onda (valores 0-255, cualquier largo) a la tabla de
+        256 muestras, con interpolación lineal (circular: después de la
+        última muestra viene la primera).
+        """
+        L = len(onda)
+        n = len(self.tabla)
+        for i in range(n):
+            pos = i * L / n
+            k = int(pos)
+            a = pos - k
+            v = onda[k] * (1 - a) + onda[(k + 1) % L] * a
+            self.tabla[i] = int(v + 0.5)
+
+    def set_frecuencia(self, frecuencia):
+        """Cambia la frecuencia de salida; tiene que estar entre 0 y fs/2 (sin incluirlos)."""
+        if not 0 < frecuencia < self.fs / 2:
+            raise ValueError("la frecuencia debe estar entre 0 y %g Hz (fs/2)" % (self.fs / 2))
+        self.frecuencia = frecuencia
+        self.incremento = int(frecuencia * (1 << self.BITS_FASE) / self.fs + 0.5)
+
+    def frecuencia_real(self):
+        """Frecuencia que efectivamente sale por el DAC."""
+        return self.incremento * self.fs / (1 << self.BITS_FASE)
+
+    def _tick(self, t):
+        self.fase = (self.fase + self.incremento) & 0xFFFFFF
+        self._escribir(self.tabla[self.fase >> (self.BITS_FASE - self.BITS_TABLA)])
+
+    def iniciar(self):
+        self.activo = True
+        self.timer.init(freq=self.fs, mode=Timer.PERIODIC, callback=self._cb)
+
+    def detener(self):
+        self.activo = False
+        self.timer.deinit()
+
+def avisar_muestreo(N, frecuencia):
+    """Avisa si a esta frecuencia quedan pocas muestras por ciclo o armónicos arriba de fs/2."""
+    muestras = fs_dac / frecuencia
+    if muestras < MIN_MUESTRAS_POR_CICLO:
+        print("Aviso: %.1f muestras por ciclo a %g Hz (fs_dac = %d Hz)" % (muestras, frecuencia, fs_dac))
+    if N * frecuencia >= fs_dac / 2:
+        n_max = int((fs_dac / 2) / frecuencia)
+        if n_max * frecuencia >= fs_dac / 2:
+            n_max -= 1
+        if n_max % 2 == 0:
+            n_max -= 1
+        print("Aviso: los armónicos por encima de %g Hz se repliegan (aliasing); N máximo sin aliasing: %d" % (
+            fs_dac / 2, n_max))
+
+reproductor = ReproductorDDS(dac, fs_dac)
+reproductor.set_frecuencia(frecuencia_base)
+N_actual = 1
+
 while True:
     try:
-        entrada = input("Ingresá un número impar de armónicos N (ej: 1,3,5...): ")
+        entrada = input("Ingresá un número impar de armónicos N (ej: 1,3,5...) o f<Hz> para cambiar la frecuencia: ")
+        if entrada.strip().startswith("f"):
+            try:
+                frecuencia = float(entrada.strip()[1:])
+            except ValueError:
+                print("Frecuencia inválida. Ejemplo: f440")
+                continue
+            try:
+                reproductor.set_frecuencia(frecuencia)
+            except ValueError as e:
+                print("Frecuencia inválida:", e)
+                continue
+            print("Frecuencia de salida: %.3f Hz" % reproductor.frecuencia_real())
+            avisar_muestreo(N_actual, frecuencia)
+            continue
         if not entrada.strip().isdigit():
             print("Entrada inválida. Debe ser un número impar positivo.")
             continue
@@ -62,18 +226,20 @@ while True:
             continue
 
         print(f"\nGenerando señal con N = {N} armónicos...")
-        onda, dt = generar_onda_cuadrada_fourier(N, frecuencia_base)
+        N_actual = N
+        avisar_muestreo(N, reproductor.frecuencia)
+        onda = generar_onda_cuadrada_fourier(N)
 
         print("\nVista aproximada de la señal:")
         graficar_onda_ascii(onda)
 
-        print("\nReproduciendo señal... (Ctrl+C para detener)\n")
-        while True:
-            for muestra in onda:
-                dac.write(muestra)
-                time.sleep_us(int(dt * 1_000_000))
+        reproductor.cargar(onda)
+        if not reproductor.activo:
+            reproductor.iniciar()
+        print("\nReproduciendo señal a %.3f Hz (Ctrl+C para detener)\n" % reproductor.frecuencia_real())
 
     except KeyboardInterrupt:
+        reproductor.detener()
         print("\nInterrumpido. Podés ingresar otro N.\n")
         continue
     except Exception as e:
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Barrido por lotes de modulación/demodulación AM, sin reproducir ni graficar.
+
+Para cada archivo de audio de una carpeta y cada combinación de
+(frecuencia portadora, índice de modulación, corte del FPB) corre
+modular -> envolvente -> filtrar y mide qué tan parecida es la señal
+recuperada a la original (SNR y correlación). Los archivos se reparten
+entre procesos; dentro de cada proceso las combinaciones (fc, m) con el
+mismo corte se calculan juntas por broadcasting de NumPy.
+
+Uso:
+    python TP3_batch_AM.py carpeta_audios resultados.csv --fc 8000 10000 --m 0.5 1 --fc-lp 1500 2000
+"""
+
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from TP3_modulacion_AM import cargar_audio, filtro_pasabajos
+
+EXTENSIONES = ('.wav', '.flac', '.ogg', '.aiff', '.aif')
+
+
+def metricas(original, recuperada):
+    """
+    SNR (dB) y correlación entre la señal original y cada fila de
+    'recuperada'. Antes se quita la media y se ajusta la ganancia por
+    mínimos cuadrados, porque la demodulación no conserva nivel ni DC.
+    """
+    a = original - original.mean()
+    r = recuperada - recuperada.mean(axis=-1, keepdims=True)
+    energia_a = np.dot(a, a)
+    energia_r = np.einsum('ij,ij->i', r, r)
+    producto = r @ a
+    ganancia = producto / np.where(energia_r > 0, energia_r, 1)
+    error = a - ganancia[:, None] * r
+    energia_error = np.einsum('ij,ij->i', error, error)
+    snr = 10 * np.log10(energia_a / np.maximum(energia_error, 1e-20))
+    correlacion = producto / np.sqrt(np.maximum(energia_a * energia_r, 1e-20))
+    return snr, correlacion
+
+
+def evaluar_archivo(ruta, fcs, ms, fc_lp, duracion_segundos, filas_por_lote):
+    """Evalúa todas las combinaciones (fc, m) para un archivo y un corte fc_lp."""
+    audio, fs = cargar_audio(ruta, duracion_segundos)
+    t = np.arange(len(audio)) / fs
+    filas = []
+
+    # Portadoras por encima de Nyquist (o corte por encima de fs/2) no tienen sentido
+    validas = []
+    for fc, m in itertools.product(fcs, ms):
+        if fc < fs / 2 and fc_lp < fs / 2:
+            validas.append((fc, m))
+        else:
+            filas.append((ruta, fc, m, fc_lp, float('nan'), float('nan')))
+
+    # Lotes de filas para acotar la memoria: cada fila es una señal completa
+    for i in range(0, len(validas), filas_por_lote):
+        lote = validas[i:i + filas_por_lote]
+        fc_col = np.array([fc for fc, _ in lote])[:, None]
+        m_col = np.array([m for _, m in lote])[:, None]
+
+        carrier = np.cos(2 * np.pi * fc_col * t)
+        am_signal = (1 + m_col * audio) * carrier
+        am_signal /= np.max(np.abs(am_signal), axis=-1, keepdims=True)
+        envolvente = np.abs(am_signal)
+        audio_recuperado = filtro_pasabajos(envolvente, fs, fc_lp)
+
+        snr, correlacion = metricas(audio, audio_recuperado)
+        for (fc, m), s, c in zip(lote, snr, correlacion):
+            filas.append((ruta, fc, m, fc_lp, float(s), float(c)))
+    return filas
+
+
+def buscar_audios(carpeta):
+    return sorted(os.path.join(carpeta, f) for f in os.listdir(carpeta)
+                  if f.lower().endswith(EXTENSIONES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Barrido AM por lotes (SNR / correlación)")
+    parser.add_argument("carpeta")
+    parser.add_argument("salida_csv")
+    parser.add_argument("--fc", type=float, nargs="+", default=[10000])
+    parser.add_argument("--m", type=float, nargs="+", default=[1])
+    parser.add_argument("--fc-lp", type=float, nargs="+", default=[2000])
+    parser.add_argument("--duracion", type=float, default=20, help="segundos de cada archivo")
+    parser.add_argument("--procesos", type=int, default=None, help="por defecto, uno por núcleo")
+    parser.add_argument("--filas-por-lote", type=int, default=8)
+    args = parser.parse_args()
+
+    archivos = buscar_audios(args.carpeta)
+    if not archivos:
+        raise SystemExit("No se encontraron archivos de audio en " + args.carpeta)
+
+    tareas = list(itertools.product(archivos, args.fc_lp))
+    print("%d archivos, %d combinaciones por archivo" %
+          (len(archivos), len(args.fc) * len(args.m) * len(args.fc_lp)))
+
+    with open(args.salida_csv, 'w', newline='') as f, \
+         ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        escritor = csv.writer(f)
+        escritor.writerow(["archivo", "fc", "m", "fc_lp", "snr_db", "correlacion"])
+        futuros = [pool.submit(evaluar_archivo, ruta, args.fc, args.m, fc_lp,
+                               args.duracion, args.filas_por_lote)
+                   for ruta, fc_lp in tareas]
+        for hechos, futuro in enumerate(as_completed(futuros), 1):
+            escritor.writerows(futuro.result())
+            f.flush()
+            print("%d/%d tareas" % (hechos, len(futuros)))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,150 +6,334 @@ Created on Fri May 16 00:16:19 2025
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 import soundfile as sf
-import sounddevice as sd
-from scipy.signal import butter, filtfilt
+import argparse
+from fractions import Fraction
+from scipy.signal import butter, filtfilt, sosfilt, sosfilt_zi, firwin, resample_poly, hilbert, welch
 
 # Función para filtro pasa bajos
 def filtro_pasabajos(data, fs, fc):
     b, a = butter(4, fc / (fs / 2), btype='low')  # Filtro de 4to orden
     return filtfilt(b, a, data)
 
-# Función para calcular y devolver magnitud FFT y eje de frecuencias
-def espectro(signal, fs):
-    N = len(signal)
-    freqs = np.fft.rfftfreq(N, 1/fs)
-    spectrum = np.abs(np.fft.rfft(signal)) / N
+# ---------- Capa de graficado ----------
+# Espectros cacheados por identidad de la señal: (id, fs, nperseg) -> (señal, freqs, espectro).
+# LRU chico: solo los últimos MAX_ESPECTROS, para no retener todas las señales analizadas.
+_cache_espectros = {}
+_orden_espectros = []
+MAX_ESPECTROS = 8
+
+def espectro_welch(signal, fs, resolucion=5.0):
+    """
+    Magnitud por Welch (promedio de segmentos con ventana Hann) con
+    resolución 'resolucion' Hz, en la misma escala que |rfft(x)| / N para
+    un tono (A/2). Se cachea por identidad del array, así volver a graficar
+    la misma señal no recalcula nada.
+    """
+    nperseg = min(len(signal), int(fs / resolucion))
+    clave = (id(signal), fs, nperseg)
+    guardado = _cache_espectros.get(clave)
+    if guardado is not None and guardado[0] is signal:
+        _orden_espectros.remove(clave)
+        _orden_espectros.append(clave)
+        return guardado[1], guardado[2]
+    freqs, potencia = welch(signal, fs, nperseg=nperseg, scaling='spectrum')
+    spectrum = np.sqrt(potencia / 2)
+    if clave in _cache_espectros:
+        _orden_espectros.remove(clave)  # id reutilizado por otra señal: se reemplaza
+    # se guarda la señal para que su id no se reutilice mientras esté en el caché
+    _cache_espectros[clave] = (signal, freqs, spectrum)
+    _orden_espectros.append(clave)
+    if len(_orden_espectros) > MAX_ESPECTROS:
+        del _cache_espectros[_orden_espectros.pop(0)]
     return freqs, spectrum
 
-# 1. Leer archivo de audio
-audio, fs = sf.read("C:/Users/Usuario01/tu_audio.ogg")  # Reemplazar con tu ruta
+def espectro_tono(frecuencia, fs, amplitud=1.0, resolucion=5.0):
+    """Espectro analítico de un coseno puro: una sola línea de altura A/2 en 'frecuencia'."""
+    if not 0 <= frecuencia <= fs / 2:
+        raise ValueError("la frecuencia del tono debe estar entre 0 y fs/2 = %g Hz" % (fs / 2))
+    nperseg = int(fs / resolucion)
+    freqs = np.fft.rfftfreq(nperseg, 1 / fs)
+    spectrum = np.zeros(len(freqs))
+    # con nperseg impar, fs/2 redondea un bin más allá del último
+    spectrum[min(int(round(frecuencia * nperseg / fs)), len(freqs) - 1)] = amplitud / 2
+    return freqs, spectrum
 
-# 2. Convertir a mono si es estéreo
-if len(audio.shape) == 2:
-    audio = audio[:, 0]
-
-# 3. Limitar a 15 segundos
-duracion_segundos = 20
-n_muestras = int(duracion_segundos * fs)
-audio = audio[:n_muestras]
-
-# 4. Normalizar
-audio = audio / np.max(np.abs(audio))
-
-# 5. Reproducir audio original
-print("▶ Reproduciendo audio original...")
-sd.play(audio, fs)
-sd.wait()
-
-# 6. Parámetros de modulación
-fc = 10000  # frecuencia portadora (Hz)
-m = 1       # índice de modulación
-
-# 7. Vector de tiempo
-t = np.arange(len(audio)) / fs
-
-# 8. Generar portadora y señal AM
-carrier = np.cos(2 * np.pi * fc * t)
-am_signal = (1 + m * audio) * carrier
-
-# 9. Normalizar señal AM
-am_signal = am_signal / np.max(np.abs(am_signal))
-
-# 10. Reproducir señal AM
-print("▶ Reproduciendo señal AM...")
-sd.play(am_signal, fs)
-sd.wait()
-
-# 11. Demodulación: detección de envolvente
-envolvente = np.abs(am_signal)
-
-# 12. Filtro pasa bajos (FPB) con cutoff a 2 kHz
-fc_lp = 2000  # Hz
-audio_recuperado = filtro_pasabajos(envolvente, fs, fc_lp)
-
-# 13. Normalizar señal demodulada
-audio_recuperado = audio_recuperado / np.max(np.abs(audio_recuperado))
-
-# 14. Reproducir señal demodulada
-print("▶ Reproduciendo señal demodulada...")
-sd.play(audio_recuperado, fs)
-sd.wait()
-
-
-# 15. Graficar señales (primeros 20 s)
-win_len = int(20 * fs)
-
-plt.figure(figsize=(12, 10))
-
-plt.subplot(4, 1, 1)
-plt.plot(t[:win_len], audio[:win_len], color='blue')
-plt.title('Señal Original (Modulante)')
-plt.ylabel('Amplitud')
-plt.grid(True)
-
-plt.subplot(4, 1, 2)
-plt.plot(t[:win_len], carrier[:win_len], color='orange')
-plt.title('Portadora (10 kHz)')
-plt.ylabel('Amplitud')
-plt.grid(True)
-
-plt.subplot(4, 1, 3)
-plt.plot(t[:win_len], am_signal[:win_len], color='green')
-plt.title('Señal AM')
-plt.ylabel('Amplitud')
-plt.grid(True)
-
-plt.subplot(4, 1, 4)
-plt.plot(t[:win_len], audio_recuperado[:win_len], color='red')
-plt.title('Señal Demodulada (FPB 2 kHz)')
-plt.xlabel('Tiempo [s]')
-plt.ylabel('Amplitud')
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
-
-# 16. Gráficas espectrales
-freq_audio, spec_audio = espectro(audio, fs)
-freq_carrier, spec_carrier = espectro(carrier, fs)
-freq_am, spec_am = espectro(am_signal, fs)
-freq_demod, spec_demod = espectro(audio_recuperado, fs)
-
-plt.figure(figsize=(12, 10))
-
-plt.subplot(4, 1, 1)
-plt.plot(freq_audio, spec_audio, color='blue')
-plt.title('Espectro - Señal Original')
-plt.xlim(0, 4000)
-plt.ylabel('Magnitud')
-plt.grid(True)
-
-plt.subplot(4, 1, 2)
-plt.plot(freq_carrier, spec_carrier, color='orange')
-plt.title('Espectro - Portadora')
-plt.xlim(0, 10000)
-plt.ylabel('Magnitud')
-plt.grid(True)
-
-plt.subplot(4, 1, 3)
-plt.plot(freq_am, spec_am*10, color='green')
-plt.title('Espectro - Señal AM')
-plt.xlim(0, 10000)
-plt.ylim(0,0.03)
-plt.ylabel('Magnitud')
-plt.grid(True)
-
-plt.subplot(4, 1, 4)
-plt.plot(freq_demod, spec_demod, color='red')
-plt.title('Espectro - Señal Demodulada')
-plt.xlim(0, 4000)
-plt.ylim(0,0.006)
-plt.xlabel('Frecuencia [Hz]')
-plt.ylabel('Magnitud')
-plt.grid(True)
-
-
-plt.tight_layout()
-plt.show()
+def reducir_minmax(t, x, pixeles):
+    """
+    Reduce una traza a su envolvente mínimo/máximo por pixel: 2 puntos por
+    columna de pantalla. Visualmente es idéntica a graficar todas las
+    muestras, pero matplotlib dibuja miles de puntos en vez de cientos de miles.
+    """
+    n = len(x)
+    por_pixel = n // pixeles
+    if por_pixel < 2:
+        return t, x
+    m = por_pixel * pixeles
+    bloques = x[:m].reshape(pixeles, por_pixel)
+    x_red = np.empty(2 * pixeles)
+    x_red[0::2] = bloques.min(axis=1)
+    x_red[1::2] = bloques.max(axis=1)
+    t_red = np.repeat(t[:m:por_pixel], 2)
+    return np.concatenate((t_red, t[m:])), np.concatenate((x_red, x[m:]))
+
+def plot_minmax(ax, t, x, **kwargs):
+    """plot() de una traza larga reducida al ancho en pixeles del eje."""
+    pixeles = max(1, int(ax.get_window_extent().width))
+    t_red, x_red = reducir_minmax(t, x, pixeles)
+    return ax.plot(t_red, x_red, **kwargs)
+
+# Lee un archivo, lo pasa a mono, lo recorta y lo normaliza
+def cargar_audio(ruta, duracion_segundos=20):
+    audio, fs = sf.read(ruta)
+    if len(audio.shape) == 2:
+        audio = audio[:, 0]
+    audio = audio[:int(duracion_segundos * fs)]
+    return audio / np.max(np.abs(audio)), fs
+
+# Demodulación con decimación: envolvente + remuestreo polifásico.
+# El audio recuperado ocupa solo 0..fc_lp, así que no hace falta tenerlo a fs.
+def demodular_decimado(am_signal, fs, fc_lp=2000, envolvente='abs', fs_salida=None):
+    """
+    Detecta la envolvente ('abs' = rectificación, 'hilbert' = módulo de la
+    señal analítica) y en una sola etapa polifásica (resample_poly) aplica
+    el FPB anti-alias con corte fc_lp y baja la tasa a fs_salida. El FIR
+    solo se evalúa en las muestras de salida, así que el trabajo posterior
+    a la detección se reduce en el factor de decimación.
+    fs_salida es entera (se puede escribir tal cual en el archivo): por
+    defecto es fs/k con el k más grande que divide a fs y deja al menos
+    2.5*fc_lp. up/down salen exactos de fs_salida/fs.
+    Devuelve (audio_recuperado normalizado, fs_salida).
+    """
+    if envolvente == 'hilbert':
+        env = np.abs(hilbert(am_signal))
+    else:
+        env = np.abs(am_signal)
+
+    fs = int(fs)
+    if fs_salida is None:
+        k = max(1, int(fs // (2.5 * fc_lp)))
+        while fs % k:
+            k -= 1
+        fs_salida = fs // k
+    fs_salida = int(round(fs_salida))
+    razon = Fraction(fs_salida, fs)
+    up, down = razon.numerator, razon.denominator
+    if max(up, down) > 1000:
+        # el FIR tiene 20*max(up, down) + 1 coeficientes
+        raise ValueError("fs_salida = %d Hz da up/down = %d/%d; elegir una tasa con "
+                         "factores más chicos respecto de fs = %d Hz" % (fs_salida, up, down, fs))
+
+    # FPB diseñado a la tasa intermedia fs*up; el corte no puede pasar el Nyquist de salida
+    corte = min(fc_lp, 0.45 * fs_salida)
+    taps = firwin(20 * max(up, down) + 1, corte, fs=fs * up)
+    audio_recuperado = resample_poly(env, up, down, window=taps)
+    audio_recuperado = audio_recuperado - np.mean(audio_recuperado)
+    return audio_recuperado / np.max(np.abs(audio_recuperado)), fs_salida
+
+
+# Procesamiento en bloques (streaming) para archivos largos:
+# la memoria queda fija sin importar la duración del audio.
+def procesar_am_streaming(entrada, salida_am, salida_demod, fc=10000, m=1, fc_lp=2000,
+                          bloque=65536, duracion_segundos=None):
+    """
+    Modula y demodula 'entrada' de a bloques con soundfile.blocks y
+    escribe ambas señales en disco a medida que se procesan.
+    - Portadora con fase continua entre bloques.
+    - FPB Butterworth en SOS con estado (sosfilt + zi) en lugar de filtfilt.
+    - Sin máximos globales: la señal AM se escala por 1/(1+m) (cota para
+      |audio| <= 1) y la demodulada se recupera analíticamente: el FPB de
+      |(1+m*a)cos| / (1+m) vale (2/pi)(1+m*a)/(1+m), de donde se despeja a.
+    """
+    if m <= 0:
+        raise ValueError("el índice de modulación m debe ser > 0 (la demodulación divide por m)")
+    info = sf.info(entrada)
+    fs = info.samplerate
+    frames = -1 if duracion_segundos is None else int(duracion_segundos * fs)
+
+    sos = butter(4, fc_lp / (fs / 2), btype='low', output='sos')
+    # Estado inicial: el del régimen permanente para una entrada constante, escalado
+    # con la primera muestra rectificada (se fija en el primer bloque). Con ceros la
+    # salida arrancaría en 0 y daría un transitorio al principio del audio.
+    zi_escalon = sosfilt_zi(sos)
+    zi = None
+    w = 2 * np.pi * fc / fs
+    fase = 0.0
+    escala_am = 1 / (1 + m)
+    escala_demod = (np.pi / 2) * (1 + m)
+
+    with sf.SoundFile(salida_am, 'w', fs, 1) as f_am, \
+         sf.SoundFile(salida_demod, 'w', fs, 1) as f_demod:
+        for x in sf.blocks(entrada, blocksize=bloque, frames=frames,
+                           dtype='float32', always_2d=True):
+            audio = x[:, 0]  # mono
+            n = len(audio)
+
+            carrier = np.cos(fase + w * np.arange(n))
+            fase = (fase + w * n) % (2 * np.pi)
+            am_signal = (1 + m * audio) * carrier * escala_am
+            f_am.write(am_signal)
+
+            envolvente = np.abs(am_signal)
+            if zi is None:
+                zi = zi_escalon * envolvente[0]
+            filtrada, zi = sosfilt(sos, envolvente, zi=zi)
+            audio_recuperado = np.clip((filtrada * escala_demod - 1) / m, -1, 1)
+            f_demod.write(audio_recuperado)
+    return fs
+
+
+def demo(ruta):
+    # Reproducción y gráficos solo en modo interactivo (el modo streaming/batch no los necesita)
+    import matplotlib.pyplot as plt
+    import sounddevice as sd
+
+    # 1-4. Leer archivo, convertir a mono, limitar a 20 segundos y normalizar
+    audio, fs = cargar_audio(ruta, duracion_segundos=20)
+
+    # 5. Reproducir audio original
+    print("▶ Reproduciendo audio original...")
+    sd.play(audio, fs)
+    sd.wait()
+
+    # 6. Parámetros de modulación
+    fc = 10000  # frecuencia portadora (Hz)
+    m = 1       # índice de modulación
+
+    # 7. Vector de tiempo
+    t = np.arange(len(audio)) / fs
+
+    # 8. Generar portadora y señal AM
+    carrier = np.cos(2 * np.pi * fc * t)
+    am_signal = (1 + m * audio) * carrier
+
+    # 9. Normalizar señal AM
+    am_signal = am_signal / np.max(np.abs(am_signal))
+
+    # 10. Reproducir señal AM
+    print("▶ Reproduciendo señal AM...")
+    sd.play(am_signal, fs)
+    sd.wait()
+
+    # 11. Demodulación: detección de envolvente
+    envolvente = np.abs(am_signal)
+
+    # 12. Filtro pasa bajos (FPB) con cutoff a 2 kHz
+    fc_lp = 2000  # Hz
+    audio_recuperado = filtro_pasabajos(envolvente, fs, fc_lp)
+
+    # 13. Normalizar señal demodulada
+    audio_recuperado = audio_recuperado / np.max(np.abs(audio_recuperado))
+
+    # 14. Reproducir señal demodulada
+    print("▶ Reproduciendo señal demodulada...")
+    sd.play(audio_recuperado, fs)
+    sd.wait()
+
+
+    # 15. Graficar señales (primeros 20 s), reducidas a mín/máx por pixel
+    win_len = int(20 * fs)
+
+    plt.figure(figsize=(12, 10))
+
+    ax = plt.subplot(4, 1, 1)
+    plot_minmax(ax, t[:win_len], audio[:win_len], color='blue')
+    plt.title('Señal Original (Modulante)')
+    plt.ylabel('Amplitud')
+    plt.grid(True)
+
+    ax = plt.subplot(4, 1, 2)
+    plot_minmax(ax, t[:win_len], carrier[:win_len], color='orange')
+    plt.title('Portadora (10 kHz)')
+    plt.ylabel('Amplitud')
+    plt.grid(True)
+
+    ax = plt.subplot(4, 1, 3)
+    plot_minmax(ax, t[:win_len], am_signal[:win_len], color='green')
+    plt.title('Señal AM')
+    plt.ylabel('Amplitud')
+    plt.grid(True)
+
+    ax = plt.subplot(4, 1, 4)
+    plot_minmax(ax, t[:win_len], audio_recuperado[:win_len], color='red')
+    plt.title('Señal Demodulada (FPB 2 kHz)')
+    plt.xlabel('Tiempo [s]')
+    plt.ylabel('Amplitud')
+    plt.grid(True)
+
+    plt.tight_layout()
+    plt.show()
+
+    # 16. Gráficas espectrales (Welch a 5 Hz de resolución; la portadora es analítica)
+    freq_audio, spec_audio = espectro_welch(audio, fs)
+    freq_carrier, spec_carrier = espectro_tono(fc, fs)
+    freq_am, spec_am = espectro_welch(am_signal, fs)
+    freq_demod, spec_demod = espectro_welch(audio_recuperado, fs)
+
+    plt.figure(figsize=(12, 10))
+
+    plt.subplot(4, 1, 1)
+    plt.plot(freq_audio, spec_audio, color='blue')
+    plt.title('Espectro - Señal Original')
+    plt.xlim(0, 4000)
+    plt.ylabel('Magnitud')
+    plt.grid(True)
+
+    plt.subplot(4, 1, 2)
+    plt.plot(freq_carrier, spec_carrier, color='orange')
+    plt.title('Espectro - Portadora')
+    plt.xlim(0, 10000)
+    plt.ylabel('Magnitud')
+    plt.grid(True)
+
+    plt.subplot(4, 1, 3)
+    plt.plot(freq_am, spec_am, color='green')
+    plt.title('Espectro - Señal AM')
+    plt.xlim(0, 10000)
+    # Recortar la línea de portadora para ver las bandas laterales
+    plt.ylim(0, 1.2 * np.percentile(spec_am[freq_am <= 10000], 99.5))
+    plt.ylabel('Magnitud')
+    plt.grid(True)
+
+    plt.subplot(4, 1, 4)
+    plt.plot(freq_demod, spec_demod, color='red')
+    plt.title('Espectro - Señal Demodulada')
+    plt.xlim(0, 4000)
+    plt.ylim(0, 0.006)
+    plt.xlabel('Frecuencia [Hz]')
+    plt.ylabel('Magnitud')
+    plt.grid(True)
+
+
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Modulación y demodulación AM de un archivo de audio")
+    parser.add_argument("entrada", nargs="?", default="C:/Users/Usuario01/tu_audio.ogg")  # Reemplazar con tu ruta
+    parser.add_argument("--stream", nargs=2, metavar=("SALIDA_AM", "SALIDA_DEMOD"),
+                        help="procesar en bloques y escribir a disco (sin reproducir ni graficar)")
+    parser.add_argument("--decimado", metavar="SALIDA_DEMOD",
+                        help="demodular con remuestreo polifásico y guardar a tasa reducida")
+    parser.add_argument("--envolvente", choices=("abs", "hilbert"), default="abs")
+    parser.add_argument("--fs-salida", type=int, default=None)
+    parser.add_argument("--fc", type=float, default=10000)
+    parser.add_argument("--m", type=float, default=1)
+    parser.add_argument("--fc-lp", type=float, default=2000)
+    parser.add_argument("--bloque", type=int, default=65536)
+    args = parser.parse_args()
+
+    if args.stream:
+        procesar_am_streaming(args.entrada, args.stream[0], args.stream[1],
+                              fc=args.fc, m=args.m, fc_lp=args.fc_lp, bloque=args.bloque)
+    elif args.decimado:
+        audio, fs = cargar_audio(args.entrada)
+        t = np.arange(len(audio)) / fs
+        am_signal = (1 + args.m * audio) * np.cos(2 * np.pi * args.fc * t)
+        am_signal = am_signal / np.max(np.abs(am_signal))
+        audio_recuperado, fs_out = demodular_decimado(am_signal, fs, args.fc_lp,
+                                                      args.envolvente, args.fs_salida)
+        sf.write(args.decimado, audio_recuperado, fs_out)
+        print("Demodulada a %d Hz (%d -> %d muestras)" % (fs_out, len(am_signal), len(audio_recuperado)))
+    else:
+        demo(args.entrada)
@@ -1,11 +1,16 @@
 from machine import Pin, I2C
-import ssd1306
+from oled_parcial import OLEDParcial
 import math
 import time
+import gc
+
+# Núcleos y planes de FFT del paquete compartido lib/dsp (copiar la carpeta
+# dsp/ a /lib en el ESP32).
+from dsp.fuente import FuenteAM
 
 # Configuración I2C y OLED
 i2c = I2C(0, scl=Pin(22), sda=Pin(21))
-oled = ssd1306.SSD1306_I2C(128, 32, i2c)
+oled = OLEDParcial(128, 32, i2c)
 
 fs = 10000  # Frecuencia de muestreo: 10 kHz
 N = 256     # Cantidad de muestras
@@ -15,16 +20,19 @@ f_portadora = 1000  # 1 kHz
 f_modulante = 100   # 100 Hz
 indice_modulacion = 1.5
 
-def generar_am():
-    señal = []
-    for n in range(N):
-        t = n / fs
-        modulante = math.cos(2 * math.pi * f_modulante * t)
-        portadora = math.cos(2 * math.pi * f_portadora * t)
-        val = (1 + indice_modulacion * modulante) * portadora
-        señal.append(val)
-    return señal
+MEDIR_MEMORIA = False  # True: imprime los bytes asignados en cada pasada (gc.mem_alloc)
+CONTINUO = False       # True: cada pasada genera las N muestras siguientes (la onda avanza, sin saltos de fase)
+BARRIDO_MODULANTE = 0  # Hz que se suman a la modulante en cada pasada (0: fija), para ver el cambio en vivo
+
+# Fuente de señal: la AM se genera girando dos fasores (portadora y modulante)
+# en lugar de calcular dos cosenos por muestra, en un buffer fijo de N muestras.
+# Con CONTINUO = False el cuadro no cambia mientras no cambien los parámetros:
+# se genera una vez, y su espectro también se calcula una sola vez.
+fuente = FuenteAM(fs, N, f_portadora, f_modulante, indice_modulacion, continuo=CONTINUO)
 
+# FFT recursiva original del TP: el programa ya no la usa (fuente.espectro() hace
+# una FFT in-place sin asignaciones), pero queda porque bench/bench.py la mide
+# como referencia en el caso fft_recursiva_tp3.
 def fft(x):
     N = len(x)
     if N <= 1:
@@ -41,13 +49,11 @@ def mostrar_onda(señal):
         y1 = int((señal[x * step] + 1.5) * (31 / 3))  # Normalizar a pantalla
         y2 = int((señal[(x + 1) * step] + 1.5) * (31 / 3))
         oled.line(x, 31 - y1, x + 1, 31 - y2, 1)
-    oled.show()
+    oled.show_parcial()
 
-def mostrar_espectro(señal):
+def mostrar_espectro(mag):
     oled.fill(0)
-    resultado = fft(señal)
-    mag = [abs(c) for c in resultado[:N // 2]]
-    max_mag = max(mag) if mag else 1
+    max_mag = max(mag) if max(mag) != 0 else 1
 
     bins_a_mostrar = 64  # número de barras para que haya separación
     ancho_oled = 128
@@ -63,17 +69,25 @@ def mostrar_espectro(señal):
         # Dibujar barra de ancho 1 px, dejando 1 px vacío después
         oled.fill_rect(x, 31 - alto, 1, alto, 1)
 
-    oled.show()
+    oled.show_parcial()
 
 
 
 
+# --- Loop principal ---
 modo = 0
 while True:
-    señal = generar_am()
+    if MEDIR_MEMORIA:
+        mem_inicio = gc.mem_alloc()
+    if BARRIDO_MODULANTE:
+        f_modulante = f_modulante + BARRIDO_MODULANTE if f_modulante < 500 else 50
+        fuente.configurar(f_modulante=f_modulante)
+    señal = fuente.cuadro()  # sin cambios (y CONTINUO = False) es el mismo buffer, sin recalcular
     if modo == 0:
         mostrar_onda(señal)
     else:
-        mostrar_espectro(señal)
+        mostrar_espectro(fuente.espectro())  # la FFT se calcula una vez por cuadro
+    if MEDIR_MEMORIA:
+        print("alloc/pasada:", gc.mem_alloc() - mem_inicio)
     modo = 1 - modo
-    time.sleep(1)
\ No newline at end of file
+    time.sleep(1)
@@ -3,16 +3,26 @@
 #Filtro FIR Orden 20, f=100Hz
 
 from machine import Pin, I2C
-import ssd1306
+from oled_parcial import OLEDParcial
+from perfil import crear as crear_perfil
 import math
 import time
-from ssd1306 import SSD1306_I2C
+from array import array
+
+# FFT y filtros FIR del paquete compartido lib/dsp (copiar la carpeta dsp/ a
+# /lib en el ESP32). Si el port tiene emisores nativos, dsp usa los núcleos
+# compilados.
+import dsp
+from dsp.fir import FiltroFIR, FiltroFIRQ15, crear_filtro, filtrar_senal
+from dsp.diseno import disenar_fir
+from dsp.zoom import zoom_fft
+from dsp.respuesta import respuesta_frecuencia
 
 # ---------- OLED setup ----------
 # Inicializamos la comunicación I2C para el OLED.
 # Usamos los pines GPIO 22 (SCL) y 21 (SDA), cambiar si usás otros pines en el microcontrolador.
 i2c = I2C(0, scl=Pin(22), sda=Pin(21))  
-oled = ssd1306.SSD1306_I2C(128, 32, i2c)  # Creamos objeto para controlar OLED 128x64
+oled = OLEDParcial(128, 32, i2c)  # Creamos objeto para controlar OLED 128x32 (con envío parcial)
 
 # ---------- Coeficientes FIR ----------
 # FIR: filtro digital de respuesta finita (Finite Impulse Response)
@@ -40,6 +50,18 @@ b = [-0.00000062, -0.00212227, -0.00632535, -0.01161181, -0.01235466,
 #       +0.0x[n-15] -0.01235466x[n-16] -0.01161181x[n-17] -0.00632535x[n-18] -0.00212227x[n-19] -0.00000062x[n-20]
 
 
+# ---------- Diseño en el ESP32 (opcional) ----------
+# Con DISENAR_FILTRO = True los coeficientes se calculan acá por el método de
+# ventanas (para la fs de la señal, más abajo) en lugar de usar la tabla de
+# arriba; la tabla es este mismo diseño con corte 100 Hz y fs = 1000 Hz.
+# Cambiando tipo, corte, orden o ventana se prueban otros filtros sin
+# recalcular la tabla en la PC; disenar_fir guarda los últimos diseños y no recalcula uno ya pedido.
+DISENAR_FILTRO = False
+TIPO_FILTRO = "pasabajos"   # "pasabajos", "pasaaltos" o "pasabanda" (CORTE = (f1, f2))
+CORTE = 100                 # Hz
+ORDEN = 20                  # coeficientes = ORDEN + 1
+VENTANA = "hamming"         # "hamming", "hann", "blackman" o "kaiser"
+
 # ---------- Señal de entrada simulada ----------
 fs = 5000  # Frecuencia de muestreo en Hz
 # Nota: fs=5000Hz permite medir señales hasta 2500Hz según Nyquist (pero el filtro corta a 100Hz)
@@ -50,24 +72,36 @@ t = [i / fs for i in range(N)]  # Vector de tiempos, de 0 a (N-1)/fs segundos
 # Se suman senoidales de diferentes frecuencias y amplitudes:
 # 10, 20, 80, 120, 550, 800, 900, 1000 Hz
 # La idea es que el filtro pasabajos atenúe las frecuencias altas (mayores a 100 Hz)
-x = [
-    2.0 * math.sin(2 * math.pi * 10 * ti)   +  # frecuencia 10 Hz, amplitud 2
-    1.0 * math.sin(2 * math.pi * 60 * ti)   +  # etc...
-    1.0 * math.sin(2 * math.pi * 100 * ti)  +
-    0.9 * math.sin(2 * math.pi * 550 * ti)  +
-    0.9 * math.sin(2 * math.pi * 800 * ti)  +
-    0.9 * math.sin(2 * math.pi * 900 * ti)  +
-    0.9 * math.sin(2 * math.pi * 1000 * ti)
-    for ti in t
-]
+def senal_prueba(ti):
+    return (
+        2.0 * math.sin(2 * math.pi * 10 * ti)   +  # frecuencia 10 Hz, amplitud 2
+        1.0 * math.sin(2 * math.pi * 60 * ti)   +  # etc...
+        1.0 * math.sin(2 * math.pi * 100 * ti)  +
+        0.9 * math.sin(2 * math.pi * 550 * ti)  +
+        0.9 * math.sin(2 * math.pi * 800 * ti)  +
+        0.9 * math.sin(2 * math.pi * 900 * ti)  +
+        0.9 * math.sin(2 * math.pi * 1000 * ti)
+    )
+
+x = [senal_prueba(ti) for ti in t]
 
 
 
 # ---------- Filtrado FIR ----------
+if DISENAR_FILTRO:
+    b = list(disenar_fir(TIPO_FILTRO, CORTE, ORDEN, fs, VENTANA))
+
 M = len(b)      #Mi longitud va a ser la longitud de todos los coeficientes previamente cargados en mis b_k
-x_pad = [0] * M #sirve para inicializar una "ventana deslizante" de longitud M, que en este caso es la cantidad de
-                #coeficientes del filtro FIR (o sea, el orden del filtro + 1).
-y = []         #por defecto vacio, aca se guardara la salida del filtro que calculmos a cada instante
+
+def crear_fir(coef):
+    #crear_filtro elige la convolución directa (FiltroFIR) o por bloques con FFT (overlap-save,
+    #FiltroFIRFFT) según M: con 21 coeficientes gana la directa, con cientos de coeficientes
+    #(ORDEN alto) la FFT hace muchas menos operaciones por muestra. La versión FFT junta las
+    #muestras en segmentos propios, así que su salida sale con retraso; filtrar_senal() lo compensa.
+    return crear_filtro(coef)
+
+fir = crear_fir(b)  #contiene la "ventana deslizante" de longitud M, que en este caso es la cantidad de
+                    #coeficientes del filtro FIR (o sea, el orden del filtro + 1).
 
 
 #¿Qué representa?
@@ -96,30 +130,35 @@ y = []         #por defecto vacio, aca se guardara la salida del filtro que calc
 #y[n]= ∑  b[k]⋅x[n−k]
 #      k=0
 
-for n in range(len(x)):
-    x_pad = [x[n]] + x_pad[:-1]  # Ventana deslizante
-    yn = 0
-    for k in range(M):
-        yn += b[k] * x_pad[k]
-    y.append(yn)
+#Rearmar la lista en cada muestra copia M elementos por salida. FiltroFIR hace lo mismo con un
+#buffer circular: solo escribe la muestra nueva y mueve un índice, sin crear listas.
+
+USAR_Q15 = False  #True: filtra con enteros (coeficientes Q15), False: filtra con floats
+ESCALA_Q = 256    #para el camino entero x se lleva a x*256 (|x| < 8 entra en 12 bits)
+
+if USAR_Q15:
+    fir_q15 = FiltroFIRQ15(b)
+    xq = array('h', [int(v * ESCALA_Q) for v in x])
+    y = [v / ESCALA_Q for v in fir_q15.process(xq)]
+else:
+    y = filtrar_senal(fir, x)  #aca se guarda la salida del filtro que calculamos a cada instante
 #-----------------------------------------------------
 
+# ---------- Decimación (pasabajos y después submuestreo) ----------
+# Después del pasabajos la señal casi no tiene nada arriba de 100 Hz, así que alcanza
+# con fs / DECIMACION muestras por segundo (1250 Hz con D = 4, Nyquist 625 Hz).
+# decimar() mete todas las muestras en la línea de retardo pero solo calcula las
+# salidas que se conservan, y[0], y[D], y[2D]...: D veces menos productos que
+# filtrar todo y descartar después.
+DECIMACION = 4
+fs_dec = fs / DECIMACION
+y_dec = FiltroFIR(b, decimacion=DECIMACION).decimar(x)  # N / D muestras a fs_dec
+
 # ---------- DFT (solo magnitud) ----------
+# La DFT directa hace N*N pares cos/sin (65k para N=256). dsp usa una FFT
+# radix-2: (N/2)*log2(N) mariposas, con tablas calculadas una sola vez por tamaño.
 def dft(signal):
-    N = len(signal)
-    mean = sum(signal) / N
-    signal = [s - mean for s in signal]  # Centrado
-    spectrum = []
-    for k in range(N // 2):
-        re = 0
-        im = 0
-        for n in range(N):
-            angle = -2 * math.pi * k * n / N
-            re += signal[n] * math.cos(angle)
-            im += signal[n] * math.sin(angle)
-        mag = math.sqrt(re ** 2 + im ** 2)
-        spectrum.append(mag)
-    return spectrum
+    return dsp.espectro_magnitud(signal)  # Centrado, N/2 bins
 
 # ---------- Mostrar en OLED ----------
 def plot_spectrum(spectrum):
@@ -131,32 +170,61 @@ def plot_spectrum(spectrum):
     for i in range(min(len(spectrum), 64)):  
         h = int((spectrum[i] / max_val) * 31)
         x_pos = 2 * i
-        oled.line(x_pos, 31, x_pos, 31 - h, 1)
-        oled.line(x_pos + 1, 31, x_pos + 1, 31 - h, 1)
-    oled.show()
+        oled.barra(x_pos, h + 1, ancho=2)
+    oled.show_parcial()
 
 
 #ZOOM DE ANCHO 0-200HZ/----------------------------
-def plot_spectrum_zoom(spectrum, zoom_bins=12):
+# Recortar los primeros 12 bins de la DFT de 256 puntos da ~20 Hz por barra.
+# La zoom FFT lleva la banda a continua, filtra, decima y hace una FFT chica:
+# ~1.6 Hz por bin en 0-200 Hz, como una FFT de 3072 puntos pero mucho más barata.
+# Usa más muestras de la misma señal (las genera una vez, la primera vez que se pide).
+F_ZOOM_INICIO = 0    # Hz
+F_ZOOM_FIN = 200     # Hz
+N_ZOOM = 256         # puntos de la FFT chica
+zoom = zoom_fft(fs, F_ZOOM_INICIO, F_ZOOM_FIN, N_ZOOM)
+x_zoom = None
+
+def espectro_zoom():
+    global x_zoom
+    if x_zoom is None:
+        x_zoom = array('f', [senal_prueba(i / fs) for i in range(zoom.muestras_necesarias())])
+    return zoom.calcular(x_zoom)
+
+def plot_spectrum_zoom(spectrum):
     oled.fill(0)
-    max_val = max(spectrum[:zoom_bins])
+    max_val = max(spectrum)
     if max_val == 0:
         max_val = 1  # evitar división por cero
 
     ancho_px = 128  # Ancho del OLED
-    escala_x = ancho_px // zoom_bins
-
-    for i in range(zoom_bins):
-        h = int((spectrum[i] / max_val) * 31)  # altura en 0-31
-        x_pos = i * escala_x
-        # dibujar barra delgada o ancha (puede ajustarse)
-        oled.line(x_pos, 31, x_pos, 31 - h, 1)
-        oled.line(x_pos + 1, 31, x_pos + 1, 31 - h, 1)
+    n = len(spectrum)
+    for x_pos in range(ancho_px):
+        # cada columna muestra el bin más alto de los que le tocan
+        i0 = x_pos * n // ancho_px
+        i1 = max(i0 + 1, (x_pos + 1) * n // ancho_px)
+        v = spectrum[i0]
+        for i in range(i0 + 1, i1):
+            if spectrum[i] > v:
+                v = spectrum[i]
+        h = int((v / max_val) * 31)  # altura en 0-31
+        oled.barra(x_pos, h)
 
     #oled.text("Zoom 0-200Hz", 0, 0, 1)
-    oled.show()
+    oled.show_parcial()
+
 
 
+# ---------- Perfil de tiempos ----------
+PERFIL = False  #True: mide cuánto tarda cada comando (cálculo y pantalla) con time.ticks_us
+E_CALCULO = 0
+E_PANTALLA = 1
+perfil = crear_perfil(("calculo", "pantalla"), activo=PERFIL)
+
+def imprimir_tiempos():
+    # Tiempos del último comando, en ms
+    print("calculo: %.1f ms, pantalla: %.1f ms" % (
+        perfil.ultimo(E_CALCULO) / 1000, perfil.ultimo(E_PANTALLA) / 1000))
 
 # ---------- Interfaz serial ----------
 def esperar_comando():
@@ -166,6 +234,9 @@ def esperar_comando():
     print(" 3 - Ver diagrama magnitud del filtro FIR")
     print(" 4 - Ver diagrama fase del filtro FIR")
     print(" 5 - Ver espectro zoom (0-200 Hz)")
+    print(" 6 - Ver espectro señal filtrada y decimada (fs/%d)" % DECIMACION)
+    if PERFIL:
+        print(" p - Ver perfil de tiempos (min/media/max/p95)")
     print(" q - Salir (reset manual)")
     cmd = input(">> ").strip()
     return cmd
@@ -175,77 +246,69 @@ def esperar_comando():
 # ---------------------------------------
 
 
-def dft_complex(signal, N):
-    """Calcula DFT y devuelve lista de valores complejos para N puntos"""
-    result = []
-    L = len(signal)
-    for k in range(N):
-        re = 0
-        im = 0
-        for n in range(L):
-            angle = -2 * math.pi * k * n / N
-            re += signal[n] * math.cos(angle)
-            im += signal[n] * math.sin(angle)
-        result.append(complex(re, im))
-    return result
-
-def magnitud(dft_vals):
-    return [abs(c) for c in dft_vals]
-
-def fase(dft_vals):
-    # Fase en grados, entre -180 y 180
-    return [math.degrees(math.atan2(c.imag, c.real)) for c in dft_vals]
-
-def plot_magnitude_phase(oled_32, mag, ph, show_phase=False):
-    oled_32.fill(0)
-    max_mag = max(mag) if mag else 1
-    # Normalizamos magnitud a 0-31 pix (alto OLED 32 px)
-    mag_norm = [int((m / max_mag) * 31) for m in mag]
+# Respuesta en frecuencia del filtro: b no cambia, así que H(e^jw) se calcula
+# una sola vez (FFT de 512 puntos de b con ceros, 257 bins de 0 a fs/2) y la
+# magnitud, la fase y el retardo de grupo quedan guardados. La primera vez
+# que se pide 3 o 4 se calcula; después pasar de una vista a la otra solo
+# dibuja. Se crea recién al usarla para no ocupar memoria si no se pide.
+N_RESPUESTA = 512
+ANCHO_OLED = 128
 
-    # Para fase normalizamos desde -180 a 180 grados a 0-31 pix
-    ph_norm = [int(((p + 180) / 360) * 31) for p in ph]
+def respuesta_filtro():
+    return respuesta_frecuencia(b, N_RESPUESTA)
 
-    length = min(len(mag_norm), 128)  # max ancho OLED
+def plot_magnitude_phase(oled_32, valores, show_phase=False):
+    oled_32.fill(0)
+    # Normalizamos entre el mínimo y el máximo a 0-31 pix (alto OLED 32 px).
+    # La magnitud arranca en 0; la fase (desenvuelta) usa todo su rango.
+    v_min = min(valores) if show_phase else 0
+    v_max = max(valores)
+    rango = (v_max - v_min) or 1
+
+    length = min(len(valores), ANCHO_OLED)  # max ancho OLED
 
     for x in range(length):
-        if show_phase:
-            y = 31 - ph_norm[x]  # invertido para que 0 esté abajo
-        else:
-            y = 31 - mag_norm[x]
+        y = 31 - int((valores[x] - v_min) / rango * 31)  # invertido para que 0 esté abajo
         oled_32.pixel(x, y, 1)
 
     # Título (texto muy pequeño, si oled lo permite)
     oled_32.text("Fs" if show_phase else "Mg", 0, 0, 1)
-    oled_32.show()
+    oled_32.show_parcial()
 
 def mostrar_magnitud():
-    N_fft = 128
-    dft_vals = dft_complex(b, N_fft)
-    mag = magnitud(dft_vals)
-    ph = fase(dft_vals)  # No se usa acá pero la calculo para consistencia
-    plot_magnitude_phase(oled, mag, ph, show_phase=False)
+    mag = respuesta_filtro().vista("magnitud", ANCHO_OLED)  # 0 a fs/2, una columna por pixel
+    perfil.marca(E_CALCULO)
+    plot_magnitude_phase(oled, mag, show_phase=False)
+    perfil.marca(E_PANTALLA)
     time.sleep(10)  # mostrar 10 segundos o el tiempo que quieras
 
 def mostrar_fase():
-    N_fft = 128
-    dft_vals = dft_complex(b, N_fft)
-    mag = magnitud(dft_vals)  # No se usa acá pero la calculo para consistencia
-    ph = fase(dft_vals)
-    plot_magnitude_phase(oled, mag, ph, show_phase=True)
+    r = respuesta_filtro()
+    ph = r.vista("fase", ANCHO_OLED)
+    perfil.marca(E_CALCULO)
+    tau = r.retardo_grupo()[0]  # fase lineal: el mismo en toda la banda
+    print("Retardo de grupo: %.1f muestras (%.2f ms)" % (tau, tau * 1000 / fs))
+    plot_magnitude_phase(oled, ph, show_phase=True)
+    perfil.marca(E_PANTALLA)
     time.sleep(10)  # mostrar 10 segundos o el tiempo que quieras
 
 
 # ---------- Loop principal ----------
 while True:
     cmd = esperar_comando()
+    perfil.inicio()
     if cmd == "1":
         print("Mostrando espectro de señal original (x[n])...")
         spec = dft(x)
+        perfil.marca(E_CALCULO)
         plot_spectrum(spec)
+        perfil.marca(E_PANTALLA)
     elif cmd == "2":
         print("Mostrando espectro de señal filtrada (y[n])...")
         spec = dft(y)
+        perfil.marca(E_CALCULO)
         plot_spectrum(spec)
+        perfil.marca(E_PANTALLA)
     elif cmd == "3":
         print("Mostrando diagrama de magnitud del filtro FIR...")
         mostrar_magnitud()
@@ -256,9 +319,25 @@ while True:
         print("Fin del programa. Reiniciá el ESP32 si querés reiniciar.")
         break
     elif cmd == "5":
-        print("Mostrando espectro de bajas frecuencias (zoom)...")
-        spec = dft(x)
-        plot_spectrum_zoom(spec, zoom_bins=12)
+        print("Mostrando espectro de bajas frecuencias (zoom, %.1f Hz por bin)..." % zoom.resolucion())
+        spec = espectro_zoom()
+        perfil.marca(E_CALCULO)
+        plot_spectrum_zoom(spec)
+        perfil.marca(E_PANTALLA)
+    elif cmd == "6":
+        print("Mostrando espectro de la señal filtrada y decimada (%d muestras a %d Hz, 0-%d Hz)..." % (
+            len(y_dec), fs_dec, fs_dec / 2))
+        spec = dft(y_dec)
+        perfil.marca(E_CALCULO)
+        plot_spectrum(spec)
+        perfil.marca(E_PANTALLA)
+    elif cmd == "p" and PERFIL:
+        perfil.reporte()
+        continue
     else:
         print("Comando no reconocido. Ingresá 1, 2, 3, 4 o q.")
-#----------------------------------------------------------------FIN------------------------------------------------------------------------
\ No newline at end of file
+        continue
+    if PERFIL:
+        perfil.fin()
+        imprimir_tiempos()
+#----------------------------------------------------------------FIN------------------------------------------------------------------------
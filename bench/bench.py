@@ -0,0 +1,515 @@
+"""
+Benchmarks de los núcleos DSP de los prácticos, en la PC (CPython).
+
+Usa los sustitutos de machine/ssd1306 de bench/stubs, así que mide las
+mismas funciones que corren en el ESP32 (versiones en Python puro: en la
+PC no están los emisores native/viper). Para cada tamaño mide el tiempo
+de cada núcleo y de un cuadro completo de tp4 (adquisición -> proceso ->
+dibujo), y si numpy está instalado compara el resultado contra numpy y
+mide cuánto tarda numpy en lo mismo.
+
+Uso:
+    python bench/bench.py
+    python bench/bench.py --tamanos 256,1024 --repeticiones 10
+    python bench/bench.py --entrada captura.wav --csv resultados.csv
+    python bench/bench.py --solo fft_plan,cuadro_tp4
+
+Sale con código 1 si algún resultado no coincide con numpy.
+"""
+
+import argparse
+import csv
+import math
+import sys
+import time
+from array import array
+
+import entorno
+
+entorno.instalar()
+
+import machine
+import dsp
+from dsp.nucleos import dft_directa
+from dsp.transformada import plan_fft, plan_rfft, PlanFFTQ15
+from dsp.fir import FiltroFIR, FiltroFIRFFT, filtrar_senal
+from dsp.diseno import disenar_fir
+from dsp.respuesta import RespuestaFrecuencia
+from dsp.fuente import FuenteAM
+from dsp.tonos import DetectorTonos
+from dsp.zoom import ZoomFFT
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TAMANOS = (64, 128, 256, 512, 1024, 2048, 4096)
+FS = 1000  # fs de la señal sintética (la del timer de tp4)
+
+
+def _error_relativo(a, b):
+    a = np.asarray(a)
+    b = np.asarray(b)
+    escala = max(float(np.max(np.abs(b))), 1e-12)
+    return float(np.max(np.abs(a - b))) / escala
+
+
+# ---------- Casos ----------
+# Cada caso recibe N, las muestras crudas (0-4095) y la señal centrada en
+# floats, y devuelve un dict con:
+#   funcion:    lo que se mide (sin argumentos, devuelve el resultado)
+#   referencia: cálculo equivalente con numpy (o None sin numpy)
+#   comparar:   (resultado, referencia) -> error
+#   extra:      (opcional) texto con datos adicionales después de medir
+
+def caso_fft_plan(N, crudo, x):
+    # fft_iter de tp4: FFT compleja con plan precalculado
+    plan = plan_fft(N)
+    re = plan.re
+    im = plan.im
+
+    def funcion():
+        for i in range(N):
+            re[i] = x[i]
+            im[i] = 0.0
+        plan.ejecutar(re, im)
+        return re, im
+
+    return {
+        "funcion": funcion,
+        "referencia": lambda: np.fft.fft(x),
+        "comparar": lambda r, ref: _error_relativo(np.array(r[0]) + 1j * np.array(r[1]), ref),
+    }
+
+def caso_rfft_plan(N, crudo, x):
+    plan = plan_rfft(N)
+    xa = array('f', x)
+
+    def funcion():
+        plan.ejecutar(xa)
+        return plan.re, plan.im
+
+    return {
+        "funcion": funcion,
+        "referencia": lambda: np.fft.rfft(xa),
+        "comparar": lambda r, ref: _error_relativo(np.array(r[0]) + 1j * np.array(r[1]), ref),
+    }
+
+def caso_fft_q15(N, crudo, x):
+    plan = PlanFFTQ15(N)
+    promedio = sum(crudo) // N
+    enteros = [c - promedio for c in crudo]
+    re = plan.re
+    im = plan.im
+
+    def funcion():
+        for i in range(N):
+            re[i] = enteros[i]
+            im[i] = 0
+        plan.ejecutar(re, im)
+        return re, im, plan.exponente
+
+    def comparar(r, ref):
+        X = (np.array(r[0]) + 1j * np.array(r[1])) * 2.0 ** r[2]
+        return _error_relativo(X, ref)
+
+    return {
+        "funcion": funcion,
+        "referencia": lambda: np.fft.fft(enteros),
+        "comparar": comparar,
+        "tolerancia": 2e-2,
+    }
+
+def caso_fft_recursiva(N, crudo, x):
+    # fft() recursiva de TP3_modulacion_AM_esp32 (crea listas en cada nivel)
+    fft = SCRIPTS["tp3"]["fft"]
+    return {
+        "funcion": lambda: fft(x),
+        "referencia": lambda: np.fft.fft(x),
+        "comparar": _error_relativo,
+        "tolerancia": 1e-9,
+    }
+
+def caso_fir(N, crudo, x):
+    # Filtro FIR de TP5 (21 coeficientes, plegado simétrico)
+    b = SCRIPTS["tp5"]["b"]
+    filtro = FiltroFIR(b)
+    xa = array('f', x)
+    salida = array('f', [0] * N)
+
+    def funcion():
+        filtro.reset()
+        return filtro.process(xa, salida)
+
+    return {
+        "funcion": funcion,
+        "referencia": lambda: np.convolve(xa, b)[:N],
+        "comparar": _error_relativo,
+    }
+
+def _caso_fir_largo(N, x, motor):
+    # Pasabajos de 201 coeficientes diseñado en el ESP32, filtrado en bloques de 256
+    # (la salida de FiltroFIRFFT sale retrasada 'latencia' muestras: se vacía con ceros)
+    b = disenar_fir("pasabajos", 100, 200, 5000)
+    filtro = motor(b)
+    lat = getattr(filtro, "latencia", 0)
+    xa = array('f', x)
+    salida = array('f', [0] * (N + lat))
+
+    def funcion():
+        filtro.reset()
+        for i in range(0, N, 256):
+            bloque = xa[i:i + 256]
+            salida[i:i + len(bloque)] = filtro.process(bloque)
+        if lat:
+            salida[N:] = filtro.process(array('f', [0] * lat))
+        return salida[lat:]
+
+    return {
+        "funcion": funcion,
+        "referencia": lambda: np.convolve(xa, b)[:N],
+        "comparar": _error_relativo,
+    }
+
+def caso_fir_largo_directo(N, crudo, x):
+    return _caso_fir_largo(N, x, FiltroFIR)
+
+def caso_fir_largo_fft(N, crudo, x):
+    # Overlap-save: mismo filtro, costo por muestra ~ log2(nfft) en lugar de M
+    return _caso_fir_largo(N, x, lambda b: FiltroFIRFFT(b, 512))
+
+def caso_fir_decimar(N, crudo, x):
+    # Pasabajos de TP5 y submuestreo por DECIMACION con FiltroFIR.decimar()
+    tp5 = SCRIPTS["tp5"]
+    b = tp5["b"]
+    D = tp5["DECIMACION"]
+    filtro = FiltroFIR(b, decimacion=D)
+    xa = array('f', x)
+
+    def funcion():
+        filtro.reset()
+        return filtro.decimar(xa)
+
+    return {
+        "funcion": funcion,
+        "referencia": lambda: np.convolve(xa, b)[:N][::D],
+        "comparar": _error_relativo,
+    }
+
+def caso_fir_tp5_largo(N, crudo, x):
+    # El mismo crear_fir() de TP5 con un pasabajos de orden 1000: tiene que elegir
+    # la convolución por FFT (el error pasa a infinito si elige la directa)
+    crear_fir = SCRIPTS["tp5"]["crear_fir"]
+    b = disenar_fir("pasabajos", 100, 1000, 5000)
+    filtro = crear_fir(b)
+    xa = array('f', x)
+
+    def funcion():
+        filtro.reset()
+        return filtrar_senal(filtro, xa)
+
+    def comparar(y, ref):
+        if not isinstance(filtro, FiltroFIRFFT):
+            return float("inf")
+        return _error_relativo(y, ref)
+
+    return {
+        "funcion": funcion,
+        "referencia": lambda: np.convolve(xa, b)[:N],
+        "comparar": comparar,
+        "extra": lambda: "%s nfft=%s" % (type(filtro).__name__, getattr(filtro, "nfft", "-")),
+    }
+
+def caso_respuesta(N, crudo, x):
+    # |H| del FIR de TP5 con una FFT de N puntos (sin el caché de respuesta_frecuencia)
+    b = SCRIPTS["tp5"]["b"]
+    return {
+        "funcion": lambda: RespuestaFrecuencia(b, N).magnitud(),
+        "referencia": lambda: np.abs(np.fft.rfft(b, N)),
+        "comparar": _error_relativo,
+    }
+
+def caso_fuente_am(N, crudo, x):
+    # Cuadro AM de TP3 por recurrencia de fasores (sin el caché: se regenera en cada repetición)
+    ns = SCRIPTS["tp3"]
+    fs = ns["fs"]
+    fp = ns["f_portadora"]
+    fm = ns["f_modulante"]
+    m = ns["indice_modulacion"]
+    fuente = FuenteAM(fs, N, fp, fm, m)
+
+    def funcion():
+        fuente.reiniciar()
+        return fuente.cuadro()
+
+    n = np.arange(N)
+    return {
+        "funcion": funcion,
+        "referencia": lambda: (1 + m * np.cos(2 * np.pi * fm * n / fs)) * np.cos(2 * np.pi * fp * n / fs),
+        "comparar": _error_relativo,
+        "tolerancia": 1e-4,  # el giro en float32 acumula ~N*eps
+    }
+
+def caso_dft(N, crudo, x):
+    # dft() de TP5: magnitud de N/2 bins sin continua
+    dft = SCRIPTS["tp5"]["dft"]
+    return {
+        "funcion": lambda: dft(x),
+        "referencia": lambda: np.abs(np.fft.fft(np.asarray(x) - np.mean(x)))[:N // 2],
+        "comparar": _error_relativo,
+    }
+
+def caso_dft_directa(N, crudo, x):
+    if N > ARGS.max_directa:
+        return None
+    return {
+        "funcion": lambda: dft_directa(x),
+        "referencia": lambda: np.abs(np.fft.fft(np.asarray(x) - np.mean(x)))[:N // 2],
+        "comparar": _error_relativo,
+    }
+
+def caso_fourier(N, crudo, x):
+    # generar_onda_cuadrada_fourier de TP2 con N armónicos, sin tablas previas
+    tp2 = SCRIPTS["tp2"]
+    M = tp2["muestras_por_ciclo"]
+
+    def funcion():
+        tp2["sintetizador"] = tp2["SintetizadorFourier"](M)
+        return tp2["generar_onda_cuadrada_fourier"](N)
+
+    def referencia():
+        n = np.arange(M)
+        k = np.arange(1, N + 1, 2)
+        suma = (np.sin(2 * np.pi * np.outer(k, n) / M) / k[:, None]).sum(axis=0)
+        return ((suma - suma.min()) * (255 / (suma.max() - suma.min()))).astype(int)
+
+    return {
+        "funcion": funcion,
+        "referencia": referencia,
+        # error en cuentas del DAC (redondeos de float32 pueden mover 1 cuenta)
+        "comparar": lambda r, ref: float(np.max(np.abs(np.array(r, dtype=int) - ref))),
+        "tolerancia": 1,
+    }
+
+def caso_zoom(N, crudo, x):
+    # Zoom FFT de TP5 (banda 0-200 Hz a fs = 5000) con una FFT chica de N puntos
+    tp5 = SCRIPTS["tp5"]
+    fs = tp5["fs"]
+    try:
+        zoom = ZoomFFT(fs, tp5["F_ZOOM_INICIO"], tp5["F_ZOOM_FIN"], N)
+    except ValueError:
+        return None  # N tan grande que la entrada no entra en MUESTRAS_MAX
+    senal = array('f', [tp5["senal_prueba"](i / fs) for i in range(zoom.muestras_necesarias())])
+
+    def referencia():
+        # mezclar, filtrar y decimar con numpy sobre la señal completa
+        n = np.arange(len(senal))
+        z = np.asarray(senal) * np.exp(-2j * np.pi * zoom.fc / fs * n)
+        y = np.convolve(z, zoom.h)[zoom.M - 1::zoom.D][:N] * np.hanning(N + 1)[:N]
+        X = np.fft.fftshift(np.fft.fft(y))
+        return np.abs(X[zoom.i0:zoom.i1 + 1]) * zoom.escala
+
+    return {
+        "funcion": lambda: zoom.calcular(senal),
+        "referencia": referencia,
+        "comparar": _error_relativo,
+    }
+
+def caso_goertzel(N, crudo, x):
+    # Detector de tonos de tp4: un bloque de N muestras crudas por los filtros de Goertzel
+    tp4 = SCRIPTS["tp4"]
+    tonos = tp4["TONOS"]
+    fs = tp4["FS_TONOS"]
+    xa = array('H', crudo)
+
+    def funcion():
+        detector = DetectorTonos(tonos, fs, N)
+        detector.agregar(xa)
+        return detector.amplitud
+
+    def referencia():
+        n = np.arange(N)
+        w = 2 * np.pi * np.array(tonos) / fs
+        return np.abs(np.exp(-1j * np.outer(w, n)) @ (np.asarray(crudo) - 2048.0)) * 2 / N
+
+    return {
+        "funcion": funcion,
+        "referencia": referencia,
+        "comparar": _error_relativo,
+        # coeficientes y estado en float32: el error de Goertzel crece con N
+        "tolerancia": 1e-3,
+    }
+
+def caso_cuadro_tp4(N, crudo, x):
+    # Un cuadro del modo FFT de tp4: N ticks del timer llenan el buffer,
+    # se quita la continua, rfft, magnitudes, pico, barras y show_parcial()
+    tp4 = SCRIPTS["tp4"]
+    oled = tp4["oled"]
+    i2c = tp4["i2c"]
+    adquisicion = tp4["AdquisicionADC"](tp4["adc"], N, tp4["FS_ADC"])
+    adquisicion.iniciar()
+    timer = adquisicion.timer
+    plan = plan_rfft(N)
+    raw_dc = array('f', [0] * N)
+    mag = array('f', [0] * (N // 2))
+
+    def funcion():
+        timer.disparar(N)
+        raw = adquisicion.obtener()
+        suma = 0
+        for i in range(N):
+            suma += raw[i]
+        promedio = suma / N
+        for i in range(N):
+            raw_dc[i] = raw[i] - promedio
+        oled.fill(0)
+        plan.ejecutar(raw_dc)
+        re = plan.re
+        im = plan.im
+        for k in range(N // 2):
+            mag[k] = math.sqrt(re[k] * re[k] + im[k] * im[k])
+        k_pico = 0
+        for k in range(1, N // 2):
+            if mag[k] > mag[k_pico]:
+                k_pico = k
+        max_mag = mag[k_pico] if mag[k_pico] != 0 else 1
+        fs_real = adquisicion.frecuencia_muestreo()
+        for k in range(min(64, len(mag))):
+            h = int(mag[k] / max_mag * 31)
+            oled.barra(64 + k * 4, h, ancho=2)
+            oled.barra(62 - k * 4, h, ancho=2)
+        oled.text("%dHz" % int(k_pico * fs_real / N), 0, 0)
+        adquisicion.liberar()
+        oled.show_parcial()
+        return k_pico
+
+    def extra():
+        cuadros = ARGS.repeticiones + 1
+        por_cuadro = i2c.bytes_escritos / cuadros
+        bus_ms = i2c.tiempo_bus_us() / cuadros / 1000
+        return "i2c %d B/cuadro (%.2f ms a %d kHz)" % (por_cuadro, bus_ms, i2c.freq // 1000)
+
+    i2c.reiniciar_contadores()
+    return {
+        "funcion": funcion,
+        # la referencia se calcula sobre el último cuadro procesado (queda en raw_dc)
+        "referencia": lambda: int(np.argmax(np.abs(np.fft.rfft(raw_dc))[:N // 2])),
+        "comparar": lambda k_pico, ref: abs(k_pico - ref),
+        "tolerancia": 0,
+        "extra": extra,
+    }
+
+CASOS = (
+    ("fft_plan", caso_fft_plan),
+    ("rfft_plan", caso_rfft_plan),
+    ("fft_q15", caso_fft_q15),
+    ("fft_recursiva_tp3", caso_fft_recursiva),
+    ("fuente_am_tp3", caso_fuente_am),
+    ("fir_tp5", caso_fir),
+    ("fir_decimar_tp5", caso_fir_decimar),
+    ("fir201_directo", caso_fir_largo_directo),
+    ("fir201_fft", caso_fir_largo_fft),
+    ("fir1001_tp5", caso_fir_tp5_largo),
+    ("respuesta_tp5", caso_respuesta),
+    ("dft_tp5", caso_dft),
+    ("dft_directa", caso_dft_directa),
+    ("fourier_tp2", caso_fourier),
+    ("goertzel_tp4", caso_goertzel),
+    ("zoom_tp5", caso_zoom),
+    ("cuadro_tp4", caso_cuadro_tp4),
+)
+
+SCRIPTS = {}
+ARGS = None
+
+
+def cargar_scripts():
+    SCRIPTS["tp4"] = entorno.cargar_script("tp4/TP4_FFT.py", "# --- Carátula inicial ---")
+    SCRIPTS["tp3"] = entorno.cargar_script("TP3/TP3_modulacion_AM_esp32.py", "# --- Loop principal ---")
+    SCRIPTS["tp5"] = entorno.cargar_script("TP5/TP5 FILTRO FIR.py", "# ---------- Interfaz serial")
+    SCRIPTS["tp2"] = entorno.cargar_script("TP2/FOURIER_ESP32.py", "while True:")
+    # En el ESP32 no hay numpy: medir siempre el backend puro de dsp
+    dsp.usar_backend("puro")
+
+def medir(funcion, repeticiones):
+    """Una pasada de calentamiento y 'repeticiones' medidas; devuelve (resultado, mínimo, media) en segundos."""
+    resultado = funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return resultado, min(tiempos), sum(tiempos) / len(tiempos)
+
+def correr(tamanos, muestras, solo=None):
+    machine.conectar_fuente(muestras)
+    filas = []
+    for nombre, crear in CASOS:
+        if solo and nombre not in solo:
+            continue
+        for N in tamanos:
+            crudo = [muestras[i % len(muestras)] for i in range(N)]
+            x = [(c - 2048) / 2048 for c in crudo]
+            caso = crear(N, crudo, x)
+            if caso is None:
+                continue
+            resultado, t_min, t_media = medir(caso["funcion"], ARGS.repeticiones)
+            fila = {"caso": nombre, "N": N, "min_ms": t_min * 1000, "media_ms": t_media * 1000,
+                    "numpy_ms": None, "error": None, "estado": "-", "extra": ""}
+            if np is not None:
+                referencia, t_np, _ = medir(caso["referencia"], ARGS.repeticiones)
+                fila["numpy_ms"] = t_np * 1000
+                fila["error"] = caso["comparar"](resultado, referencia)
+                fila["estado"] = "ok" if fila["error"] <= caso.get("tolerancia", 1e-4) else "FALLA"
+            if "extra" in caso:
+                fila["extra"] = caso["extra"]()
+            filas.append(fila)
+            imprimir_fila(fila)
+    return filas
+
+def imprimir_fila(fila):
+    numpy_ms = "%10.3f" % fila["numpy_ms"] if fila["numpy_ms"] is not None else "%10s" % "-"
+    error = "%9.2e" % fila["error"] if fila["error"] is not None else "%9s" % "-"
+    print("%-18s %5d %10.3f %10.3f %s %s  %-5s %s" % (
+        fila["caso"], fila["N"], fila["min_ms"], fila["media_ms"], numpy_ms, error,
+        fila["estado"], fila["extra"]))
+
+def main():
+    global ARGS
+    parser = argparse.ArgumentParser(description="Benchmarks de los núcleos DSP en la PC")
+    parser.add_argument("--tamanos", default=",".join(str(n) for n in TAMANOS),
+                        help="tamaños separados por coma (potencias de 2)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--entrada", help="captura .wav o .txt (una muestra 0-4095 por línea)")
+    parser.add_argument("--solo", help="casos separados por coma: " + ",".join(n for n, _ in CASOS))
+    parser.add_argument("--max-directa", type=int, default=512,
+                        help="N máximo para la DFT directa (O(N^2))")
+    parser.add_argument("--csv", help="guardar los resultados en un CSV")
+    ARGS = parser.parse_args()
+
+    tamanos = [int(n) for n in ARGS.tamanos.split(",")]
+    solo = set(ARGS.solo.split(",")) if ARGS.solo else None
+    if ARGS.entrada:
+        muestras = entorno.leer_muestras(ARGS.entrada)
+    else:
+        muestras = entorno.senal_sintetica(max(tamanos) * 4, FS)
+
+    cargar_scripts()
+    if np is None:
+        print("numpy no está instalado: no se comparan resultados")
+    print("%-18s %5s %10s %10s %10s %9s  %-5s" % (
+        "caso", "N", "min ms", "media ms", "numpy ms", "error", "estado"))
+    filas = correr(tamanos, muestras, solo)
+
+    if ARGS.csv:
+        with open(ARGS.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=list(filas[0].keys()) if filas else ["caso"])
+            w.writeheader()
+            w.writerows(filas)
+    if any(f["estado"] == "FALLA" for f in filas):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
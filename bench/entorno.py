@@ -0,0 +1,110 @@
+# Entorno para correr los scripts del ESP32 en la PC: pone los sustitutos
+# de machine/ssd1306/framebuf y lib/ en el sys.path, agrega a time y gc las
+# funciones de MicroPython que usan los scripts, y ejecuta un script hasta
+# antes de su loop principal para usar sus funciones y objetos.
+
+import gc
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+import wave
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(BENCH)
+STUBS = os.path.join(BENCH, "stubs")
+LIB = os.path.join(RAIZ, "lib")
+
+# Los ticks de MicroPython dan la vuelta en 2**30
+PERIODO_TICKS = 1 << 30
+_t0 = time.perf_counter_ns()
+
+def _ticks_us():
+    return ((time.perf_counter_ns() - _t0) // 1000) & (PERIODO_TICKS - 1)
+
+def _ticks_ms():
+    return ((time.perf_counter_ns() - _t0) // 1000000) & (PERIODO_TICKS - 1)
+
+def _ticks_diff(a, b):
+    mitad = PERIODO_TICKS // 2
+    return ((a - b + mitad) & (PERIODO_TICKS - 1)) - mitad
+
+def _ticks_add(t, d):
+    return (t + d) & (PERIODO_TICKS - 1)
+
+def _mem_alloc():
+    # Con tracemalloc activo devuelve los bytes asignados, si no 0
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return 0
+
+def instalar():
+    """Prepara sys.path, time y gc para importar los scripts del ESP32."""
+    for ruta in (LIB, STUBS):
+        if ruta not in sys.path:
+            sys.path.insert(0, ruta)
+    if not hasattr(time, "ticks_us"):
+        time.ticks_us = _ticks_us
+        time.ticks_ms = _ticks_ms
+        time.ticks_diff = _ticks_diff
+        time.ticks_add = _ticks_add
+        time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+        time.sleep_us = lambda us: time.sleep(us / 1000000)
+    if not hasattr(gc, "mem_alloc"):
+        gc.mem_alloc = _mem_alloc
+        gc.mem_free = lambda: 0
+
+def cargar_script(ruta, hasta):
+    """
+    Ejecuta el script (ruta relativa a la raíz del repo) hasta la línea que
+    empieza con 'hasta' (sin incluirla) y devuelve su espacio de nombres.
+    Así se obtienen sus funciones y objetos sin entrar al loop infinito.
+    """
+    instalar()
+    ruta = os.path.join(RAIZ, ruta)
+    with open(ruta, encoding="utf-8") as f:
+        fuente = f.read()
+    corte = fuente.find("\n" + hasta)
+    if corte < 0:
+        raise ValueError("no se encontró %r en %s" % (hasta, ruta))
+    ns = {"__name__": "__bench__", "__file__": ruta}
+    exec(compile(fuente[:corte + 1], ruta, "exec"), ns)
+    return ns
+
+# ---------- Fuentes de muestras (enteros de 12 bits, como el ADC) ----------
+def senal_sintetica(n, fs, tonos=((50, 0.5), (180, 0.2), (420, 0.1)), ruido=0.02, semilla=1):
+    """Suma de senoidales (frecuencia Hz, amplitud relativa) más ruido, centrada en 2048."""
+    azar = random.Random(semilla)
+    muestras = []
+    for i in range(n):
+        t = i / fs
+        v = sum(a * math.sin(2 * math.pi * f * t) for f, a in tonos)
+        v += azar.gauss(0, ruido)
+        muestras.append(min(4095, max(0, int(2048 + 2047 * v))))
+    return muestras
+
+def leer_muestras(ruta):
+    """
+    Lee una captura: .wav (PCM 8/16 bits, se usa el primer canal) o texto
+    con una muestra por línea (ya en 0-4095). Devuelve enteros de 12 bits.
+    """
+    if ruta.lower().endswith(".wav"):
+        with wave.open(ruta, "rb") as w:
+            ancho = w.getsampwidth()
+            canales = w.getnchannels()
+            datos = w.readframes(w.getnframes())
+        if ancho == 1:
+            valores = [b - 128 for b in datos[::canales]]
+            return [min(4095, (v + 128) << 4) for v in valores]
+        if ancho != 2:
+            raise ValueError("solo WAV de 8 o 16 bits")
+        paso = 2 * canales
+        muestras = []
+        for i in range(0, len(datos) - 1, paso):
+            v = int.from_bytes(datos[i:i + 2], "little", signed=True)
+            muestras.append((v + 32768) >> 4)
+        return muestras
+    with open(ruta) as f:
+        return [int(float(linea)) for linea in f if linea.strip()]
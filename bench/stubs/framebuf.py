@@ -0,0 +1,84 @@
+# Sustituto de framebuf (solo MONO_VLSB, el formato del SSD1306) en Python.
+
+MONO_VLSB = 0
+
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, format=MONO_VLSB, stride=None):
+        self.buf = buffer
+        self.w = width
+        self.h = height
+
+    def fill(self, c):
+        v = 0xFF if c else 0
+        buf = self.buf
+        for i in range(len(buf)):
+            buf[i] = v
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self.w and 0 <= y < self.h):
+            return None if c is not None else 0
+        i = (y >> 3) * self.w + x
+        bit = 1 << (y & 7)
+        if c is None:
+            return 1 if self.buf[i] & bit else 0
+        if c:
+            self.buf[i] |= bit
+        else:
+            self.buf[i] &= ~bit & 0xFF
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(y, 0), min(y + h, self.h)):
+            for xx in range(max(x, 0), min(x + w, self.w)):
+                self.pixel(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def line(self, x0, y0, x1, y1, c):
+        # Bresenham
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x0, y0, c)
+            if x0 == x1 and y0 == y1:
+                return
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def text(self, s, x, y, c=1):
+        # Sin la fuente de 8x8: marca el recuadro de cada carácter para que
+        # el costo de dibujar y enviar texto sea parecido al real
+        for i in range(len(s)):
+            if s[i] != ' ':
+                self.rect(x + 8 * i + 1, y + 1, 6, 6, c)
+
+    def scroll(self, dx, dy):
+        pass
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        for yy in range(fbuf.h):
+            for xx in range(fbuf.w):
+                c = fbuf.pixel(xx, yy)
+                if c != key:
+                    self.pixel(x + xx, y + yy, c)
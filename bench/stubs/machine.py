@@ -0,0 +1,135 @@
+# Sustituto de machine para correr los scripts en la PC (benchmarks).
+# Implementa solo lo que usan los prácticos: Pin, ADC, DAC, I2C y Timer.
+# El ADC lee de una fuente de muestras que carga el benchmark y el Timer
+# no corre solo: disparar(n) ejecuta el callback n veces.
+
+_fuente = [2048]
+_pos = 0
+
+def conectar_fuente(muestras):
+    """Carga las muestras (enteros 0-4095) que devuelven los ADC, en bucle."""
+    global _fuente, _pos
+    _fuente = [int(v) for v in muestras] or [2048]
+    _pos = 0
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    PULL_UP = 2
+    PULL_DOWN = 1
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self._valor = value or 0
+
+    def value(self, v=None):
+        if v is None:
+            return self._valor
+        self._valor = 1 if v else 0
+
+    def on(self):
+        self._valor = 1
+
+    def off(self):
+        self._valor = 0
+
+
+class ADC:
+    ATTN_0DB = 0
+    ATTN_2_5DB = 1
+    ATTN_6DB = 2
+    ATTN_11DB = 3
+    WIDTH_9BIT = 0
+    WIDTH_10BIT = 1
+    WIDTH_11BIT = 2
+    WIDTH_12BIT = 3
+
+    def __init__(self, pin, atten=None):
+        self.pin = pin
+        self.lecturas = 0
+
+    def atten(self, atten):
+        pass
+
+    def width(self, width):
+        pass
+
+    def read(self):
+        global _pos
+        v = _fuente[_pos]
+        _pos += 1
+        if _pos == len(_fuente):
+            _pos = 0
+        self.lecturas += 1
+        return v
+
+    def read_u16(self):
+        return self.read() << 4
+
+
+class DAC:
+    # Sin write_timed: los scripts usan el camino por Timer
+    def __init__(self, pin, bits=8):
+        self.pin = pin
+        self.ultimo = 0
+        self.escrituras = 0
+
+    def write(self, valor):
+        self.ultimo = valor
+        self.escrituras += 1
+
+
+class I2C:
+    """Cuenta los bytes escritos y estima el tiempo de bus (9 bits por byte)."""
+    def __init__(self, id=0, scl=None, sda=None, freq=400000):
+        self.freq = freq
+        self.bytes_escritos = 0
+        self.transacciones = 0
+
+    def scan(self):
+        return [0x3C]
+
+    def writeto(self, addr, buf, stop=True):
+        self.bytes_escritos += len(buf) + 1  # + byte de dirección
+        self.transacciones += 1
+        return 1
+
+    def writevto(self, addr, vector, stop=True):
+        self.bytes_escritos += sum(len(b) for b in vector) + 1
+        self.transacciones += 1
+        return 1
+
+    def tiempo_bus_us(self):
+        return self.bytes_escritos * 9 * 1000000 / self.freq
+
+    def reiniciar_contadores(self):
+        self.bytes_escritos = 0
+        self.transacciones = 0
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=0, **kwargs):
+        self.id = id
+        self.callback = None
+        self.freq = 0
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, freq=-1, period=-1, callback=None):
+        self.freq = freq
+        self.callback = callback
+
+    def deinit(self):
+        self.callback = None
+
+    def disparar(self, n=1):
+        """Ejecuta el callback n veces (n ticks del timer)."""
+        cb = self.callback
+        if cb is None:
+            return
+        for _ in range(n):
+            cb(self)
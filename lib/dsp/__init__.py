@@ -0,0 +1,53 @@
+# Paquete DSP compartido por los prácticos (copiar la carpeta dsp/ a /lib
+# en el ESP32, o agregar lib/ al sys.path en la PC).
+#
+# Importar "dsp" no crea tablas ni reserva buffers: el backend se elige la
+# primera vez que se usa una de las funciones de abajo. En la PC se usa
+# numpy si está instalado; en MicroPython (o sin numpy) se usa la versión
+# con array y planes precalculados. Las clases con estado (planes de FFT,
+# filtros FIR, analizador) se importan directo de su módulo:
+#
+#   from dsp.transformada import plan_rfft, PlanFFTQ15
+#   from dsp.fir import FiltroFIR, FiltroFIRQ15
+#   from dsp.espectro import AnalizadorEspectro
+
+_backend = None
+
+def usar_backend(nombre):
+    """Fuerza el backend: "numpy" o "puro"."""
+    global _backend
+    if nombre == "numpy":
+        from . import _numpy as b
+    elif nombre == "puro":
+        from . import _puro as b
+    else:
+        raise ValueError("backend desconocido: " + str(nombre))
+    _backend = b
+    return b
+
+def backend():
+    """Devuelve el módulo del backend activo (lo elige en la primera llamada)."""
+    global _backend
+    if _backend is None:
+        try:
+            from . import _numpy as b
+        except ImportError:
+            from . import _puro as b
+        _backend = b
+    return _backend
+
+def fft(x, N=None):
+    """DFT compleja de N puntos (por defecto len(x)), con zero-padding o plegado."""
+    return backend().fft(x, N)
+
+def rfft(x):
+    """Los N/2 + 1 bins no redundantes de la FFT de una señal real."""
+    return backend().rfft(x)
+
+def espectro_magnitud(signal):
+    """Magnitud de los N/2 primeros bins, sin la componente de continua."""
+    return backend().espectro_magnitud(signal)
+
+def filtrar(b, x):
+    """Salida de un FIR causal con coeficientes b (estado inicial nulo), largo len(x)."""
+    return backend().filtrar(b, x)
@@ -0,0 +1,267 @@
+# Núcleos DSP compilados con los emisores de MicroPython (@micropython.native
+# y @micropython.viper).
+#
+# Cada función tiene la misma firma y hace las mismas operaciones, en el
+# mismo orden, que su versión en Python puro de nucleos.py, así que los
+# resultados son idénticos. Fuera de MicroPython (o en un port sin emisor
+# nativo) este import falla y nucleos.py se queda con la versión en Python.
+#
+# - native: código de máquina para el mismo Python (floats, listas, arrays).
+# - viper: enteros de máquina y punteros a los buffers de array('h'/'i').
+#   Las lecturas de ptr16 son sin signo, por eso se extiende el signo a mano.
+#   Viper admite hasta 4 argumentos: los parámetros chicos van empaquetados.
+
+import math
+import micropython
+
+
+# ---------- Float (native) ----------
+
+@micropython.native
+def permutar(re, im, swap_i, swap_j):
+    for s in range(len(swap_i)):
+        i = swap_i[s]
+        j = swap_j[s]
+        re[i], re[j] = re[j], re[i]
+        im[i], im[j] = im[j], im[i]
+
+
+@micropython.native
+def fft_etapas(re, im, tw_re, tw_im, N):
+    size = 2
+    while size <= N:
+        half = size >> 1
+        paso = N // size
+        for i in range(0, N, size):
+            k = 0
+            for j in range(i, i + half):
+                l = j + half
+                wr = tw_re[k]
+                wi = tw_im[k]
+                tr = wr * re[l] - wi * im[l]
+                ti = wr * im[l] + wi * re[l]
+                re[l] = re[j] - tr
+                im[l] = im[j] - ti
+                re[j] += tr
+                im[j] += ti
+                k += paso
+        size <<= 1
+
+
+@micropython.native
+def fir_producto(b, buf, pos, M, simetria):
+    yn = 0.0
+    if simetria == 1:
+        ultimo = pos + M - 1
+        for k in range(M // 2):
+            yn += b[k] * (buf[pos + k] + buf[ultimo - k])
+        if M % 2:
+            yn += b[M // 2] * buf[pos + M // 2]
+    elif simetria == -1:
+        ultimo = pos + M - 1
+        for k in range(M // 2):
+            yn += b[k] * (buf[pos + k] - buf[ultimo - k])
+    else:
+        for k in range(M):
+            yn += b[k] * buf[pos + k]
+    return yn
+
+
+@micropython.native
+def dft_directa(signal):
+    N = len(signal)
+    mean = sum(signal) / N
+    signal = [s - mean for s in signal]
+    spectrum = []
+    for k in range(N // 2):
+        re = 0
+        im = 0
+        for n in range(N):
+            angle = -2 * math.pi * k * n / N
+            re += signal[n] * math.cos(angle)
+            im += signal[n] * math.sin(angle)
+        mag = math.sqrt(re ** 2 + im ** 2)
+        spectrum.append(mag)
+    return spectrum
+
+
+@micropython.native
+def goertzel(x, i0, i1, c, estado, j, centro):
+    # Recurrencia de Goertzel s[n] = x[n] + c*s[n-1] - s[n-2] sobre x[i0:i1];
+    # el estado (s[n-1], s[n-2]) del tono queda en estado[j], estado[j + 1]
+    s1 = estado[j]
+    s2 = estado[j + 1]
+    for i in range(i0, i1):
+        s0 = (x[i] - centro) + c * s1 - s2
+        s2 = s1
+        s1 = s0
+    estado[j] = s1
+    estado[j + 1] = s2
+
+
+@micropython.native
+def mezclar_decimar(x, g_re, g_im, rot_re, rot_im, re, im, D):
+    # Salida m del pasabanda complejo g (pasabajos por la portadora) en n = m*D + M - 1,
+    # llevada a banda base con rot: re[m] + j*im[m]
+    M = len(g_re)
+    n = M - 1
+    for m in range(len(re)):
+        ar = 0.0
+        ai = 0.0
+        for k in range(M):
+            v = x[n - k]
+            ar += g_re[k] * v
+            ai += g_im[k] * v
+        re[m] = ar * rot_re[m] - ai * rot_im[m]
+        im[m] = ar * rot_im[m] + ai * rot_re[m]
+        n += D
+
+
+@micropython.native
+def oscilador_am(señal, n, osc, m):
+    # AM por recurrencia de fasores: osc = [c_p, s_p, cw_p, sw_p, c_m, s_m, cw_m, sw_m]
+    # (cos/sen de la fase actual y del giro por muestra de portadora y modulante).
+    # Al terminar osc queda en la fase de la muestra n: el cuadro siguiente sigue sin salto.
+    cp = osc[0]
+    sp = osc[1]
+    cwp = osc[2]
+    swp = osc[3]
+    cm = osc[4]
+    sm = osc[5]
+    cwm = osc[6]
+    swm = osc[7]
+    for k in range(n):
+        señal[k] = (1 + m * cm) * cp
+        t = cp * cwp - sp * swp
+        sp = sp * cwp + cp * swp
+        cp = t
+        t = cm * cwm - sm * swm
+        sm = sm * cwm + cm * swm
+        cm = t
+    osc[0] = cp
+    osc[1] = sp
+    osc[4] = cm
+    osc[5] = sm
+
+
+# ---------- Enteros Q15 (viper) ----------
+
+@micropython.viper
+def q15_permutar(re: ptr32, im: ptr32, swaps: ptr16, n: int):
+    # swaps = [i0, j0, i1, j1, ...] (array('H'))
+    s = 0
+    while s < n:
+        i = int(swaps[2 * s])
+        j = int(swaps[2 * s + 1])
+        t = re[i]
+        re[i] = re[j]
+        re[j] = t
+        t = im[i]
+        im[i] = im[j]
+        im[j] = t
+        s += 1
+
+
+@micropython.viper
+def q15_pico(re: ptr32, im: ptr32, N: int) -> int:
+    pico = 0
+    i = 0
+    while i < N:
+        v = re[i]
+        if v < 0:
+            v = -v
+        if v > pico:
+            pico = v
+        v = im[i]
+        if v < 0:
+            v = -v
+        if v > pico:
+            pico = v
+        i += 1
+    return pico
+
+
+@micropython.viper
+def q15_mitad(re: ptr32, im: ptr32, N: int):
+    i = 0
+    while i < N:
+        re[i] = re[i] >> 1
+        im[i] = im[i] >> 1
+        i += 1
+
+
+@micropython.viper
+def q15_etapa(re: ptr32, im: ptr32, tw: ptr16, param: int):
+    # param = (log2(N) << 8) | log2(size); tw = [wr0, wi0, wr1, wi1, ...] en Q15 (array('h'))
+    bits = param >> 8
+    bits_size = param & 0xFF
+    N = 1 << bits
+    size = 1 << bits_size
+    half = size >> 1
+    paso = 1 << (bits - bits_size)
+    i = 0
+    while i < N:
+        k = 0
+        j = i
+        while j < i + half:
+            l = j + half
+            wr = int(tw[2 * k])
+            if wr & 0x8000:
+                wr -= 0x10000
+            wi = int(tw[2 * k + 1])
+            if wi & 0x8000:
+                wi -= 0x10000
+            tr = (wr * re[l] - wi * im[l]) >> 15
+            ti = (wr * im[l] + wi * re[l]) >> 15
+            re[l] = re[j] - tr
+            im[l] = im[j] - ti
+            re[j] = re[j] + tr
+            im[j] = im[j] + ti
+            k += paso
+            j += 1
+        i += size
+
+
+@micropython.viper
+def fir_q15(b: ptr16, buf: ptr16, pos: int, param: int) -> int:
+    # param = (M << 2) | simetría (0 = ninguna, 1 = simétrico, 2 = antisimétrico)
+    M = param >> 2
+    modo = param & 3
+    acc = 0
+    k = 0
+    if modo == 0:
+        while k < M:
+            c = int(b[k])
+            if c & 0x8000:
+                c -= 0x10000
+            x = int(buf[pos + k])
+            if x & 0x8000:
+                x -= 0x10000
+            acc += c * x
+            k += 1
+        return acc
+    ultimo = pos + M - 1
+    while k < (M >> 1):
+        c = int(b[k])
+        if c & 0x8000:
+            c -= 0x10000
+        x = int(buf[pos + k])
+        if x & 0x8000:
+            x -= 0x10000
+        y = int(buf[ultimo - k])
+        if y & 0x8000:
+            y -= 0x10000
+        if modo == 1:
+            acc += c * (x + y)
+        else:
+            acc += c * (x - y)
+        k += 1
+    if modo == 1 and (M & 1):
+        c = int(b[M >> 1])
+        if c & 0x8000:
+            c -= 0x10000
+        x = int(buf[pos + (M >> 1)])
+        if x & 0x8000:
+            x -= 0x10000
+        acc += c * x
+    return acc
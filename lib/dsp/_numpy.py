@@ -0,0 +1,29 @@
+# Backend numpy (PC): mismas funciones y mismos resultados que _puro.py,
+# devolviendo arrays de numpy. Si numpy no está, el import falla y el
+# paquete usa _puro.py.
+
+import numpy as np
+
+nombre = "numpy"
+
+def fft(x, N=None):
+    x = np.asarray(x, dtype=float)
+    L = len(x)
+    if N is None:
+        N = L
+    if L > N:
+        # plegado: la DFT de N puntos de una señal más larga suma x[n] en n % N
+        x = np.pad(x, (0, -L % N)).reshape(-1, N).sum(axis=0)
+    return np.fft.fft(x, N)
+
+def rfft(x):
+    return np.fft.rfft(np.asarray(x, dtype=float))
+
+def espectro_magnitud(signal):
+    x = np.asarray(signal, dtype=float)
+    N = len(x)
+    return np.abs(np.fft.fft(x - x.mean())[:N // 2])
+
+def filtrar(b, x):
+    x = np.asarray(x, dtype=float)
+    return np.convolve(x, np.asarray(b, dtype=float))[:len(x)]
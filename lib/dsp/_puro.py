@@ -0,0 +1,65 @@
+# Backend sin numpy (MicroPython): FFT con planes cacheados y filtros con
+# estado. Si N no es potencia de 2 se cae a la DFT directa.
+
+import math
+
+from .nucleos import dft_directa
+from .transformada import es_potencia_de_2, plan_fft, plan_rfft
+from .fir import FiltroFIR
+
+nombre = "puro"
+
+def fft(x, N=None):
+    L = len(x)
+    if N is None:
+        N = L
+    if N < 2 or not es_potencia_de_2(N):
+        return dft_compleja_directa(x, N)
+    plan = plan_fft(N)
+    re = plan.re
+    im = plan.im
+    for i in range(N):
+        re[i] = 0.0
+        im[i] = 0.0
+    for n in range(L):
+        re[n % N] += x[n]  # zero-padding (o plegado si la señal es más larga que N)
+    plan.ejecutar(re, im)
+    return [complex(re[k], im[k]) for k in range(N)]
+
+def dft_compleja_directa(x, N):
+    result = []
+    L = len(x)
+    for k in range(N):
+        re = 0
+        im = 0
+        for n in range(L):
+            angle = -2 * math.pi * k * n / N
+            re += x[n] * math.cos(angle)
+            im += x[n] * math.sin(angle)
+        result.append(complex(re, im))
+    return result
+
+def rfft(x):
+    N = len(x)
+    if N < 4 or not es_potencia_de_2(N):
+        return fft(x)[:N // 2 + 1]
+    plan = plan_rfft(N)
+    plan.ejecutar(x)
+    return [complex(plan.re[k], plan.im[k]) for k in range(plan.M + 1)]
+
+def espectro_magnitud(signal):
+    N = len(signal)
+    if N < 2 or not es_potencia_de_2(N):
+        return dft_directa(signal)
+    mean = sum(signal) / N
+    plan = plan_fft(N)
+    re = plan.re
+    im = plan.im
+    for n in range(N):
+        re[n] = signal[n] - mean  # Centrado
+        im[n] = 0.0
+    plan.ejecutar(re, im)
+    return [math.sqrt(re[k] ** 2 + im[k] ** 2) for k in range(N // 2)]
+
+def filtrar(b, x):
+    return list(FiltroFIR(b).process(x))
@@ -0,0 +1,116 @@
+# Diseño de filtros FIR por el método de ventanas (sinc enventanado), en el
+# mismo ESP32. Los coeficientes se guardan en un caché chico por parámetros.
+
+import math
+from array import array
+
+VENTANAS = ("hamming", "hann", "blackman", "kaiser")
+TIPOS = ("pasabajos", "pasaaltos", "pasabanda")
+
+
+def _i0(x):
+    # Bessel modificada de orden 0 por su serie (para la ventana de Kaiser)
+    suma = 1.0
+    termino = 1.0
+    k = 1
+    while termino > 1e-10 * suma:
+        termino *= (x / (2 * k)) ** 2
+        suma += termino
+        k += 1
+    return suma
+
+def ventana(nombre, M, beta=8.6):
+    """Ventana simétrica de M puntos: hamming, hann, blackman o kaiser (con beta)."""
+    if M == 1:
+        return [1.0]
+    w = [0.0] * M
+    for k in range((M + 1) // 2):
+        a = 2 * math.pi * k / (M - 1)
+        if nombre == "hamming":
+            v = 0.54 - 0.46 * math.cos(a)
+        elif nombre == "hann":
+            v = 0.5 - 0.5 * math.cos(a)
+        elif nombre == "blackman":
+            v = 0.42 - 0.5 * math.cos(a) + 0.08 * math.cos(2 * a)
+        elif nombre == "kaiser":
+            r = 2 * k / (M - 1) - 1
+            v = _i0(beta * math.sqrt(1 - r * r)) / _i0(beta)
+        else:
+            raise ValueError("ventana desconocida: " + str(nombre))
+        w[k] = v
+        w[M - 1 - k] = v  # simétrica exacta: el FIR queda de fase lineal
+    return w
+
+def _sinc_pasabajos(fc, M):
+    # Respuesta ideal de un pasabajos con corte fc (relativa a fs), centrada en (M-1)/2
+    h = [0.0] * M
+    centro = (M - 1) / 2
+    for k in range((M + 1) // 2):
+        n = k - centro
+        v = 2 * fc if n == 0 else math.sin(2 * math.pi * fc * n) / (math.pi * n)
+        h[k] = v
+        h[M - 1 - k] = v
+    return h
+
+def _ganancia(h, f):
+    # |H(e^jw)| en la frecuencia relativa f
+    re = 0.0
+    im = 0.0
+    for n in range(len(h)):
+        a = 2 * math.pi * f * n
+        re += h[n] * math.cos(a)
+        im -= h[n] * math.sin(a)
+    return math.sqrt(re * re + im * im)
+
+def _calcular(tipo, corte, orden, fs, nombre_ventana, beta):
+    M = orden + 1
+    w = ventana(nombre_ventana, M, beta)
+    if tipo == "pasabajos":
+        h = [a * b for a, b in zip(_sinc_pasabajos(corte / fs, M), w)]
+        s = sum(h)
+        return [v / s for v in h]          # ganancia 1 en continua
+    if tipo == "pasaaltos":
+        if M % 2 == 0:
+            raise ValueError("un pasaaltos FIR de fase lineal necesita orden par")
+        h = _calcular("pasabajos", corte, orden, fs, nombre_ventana, beta)
+        h = [-v for v in h]
+        h[M // 2] += 1                      # inversión espectral: delta - pasabajos
+        return h
+    if tipo == "pasabanda":
+        f1, f2 = corte
+        if not 0 < f1 < f2 < fs / 2:
+            raise ValueError("pasabanda: se necesita 0 < f1 < f2 < fs/2")
+        alto = _sinc_pasabajos(f2 / fs, M)
+        bajo = _sinc_pasabajos(f1 / fs, M)
+        h = [(a - b) * c for a, b, c in zip(alto, bajo, w)]
+        g = _ganancia(h, (f1 + f2) / 2 / fs)
+        return [v / g for v in h]           # ganancia 1 en el centro de la banda
+    raise ValueError("tipo desconocido: " + str(tipo))
+
+
+_cache = {}
+_orden_cache = []
+MAX_CACHE = 8
+
+def disenar_fir(tipo, corte, orden, fs, ventana="hamming", beta=8.6):
+    """
+    Coeficientes (array('f'), orden + 1) de un FIR de fase lineal.
+    tipo: "pasabajos" o "pasaaltos" con corte en Hz, o "pasabanda" con
+    corte = (f1, f2). Los diseños se guardan por (tipo, corte, orden, fs,
+    ventana, beta): pedir el mismo filtro otra vez no recalcula nada.
+    El array devuelto es compartido: no modificarlo.
+    """
+    if isinstance(corte, list):
+        corte = tuple(corte)
+    clave = (tipo, corte, orden, fs, ventana, beta)
+    h = _cache.get(clave)
+    if h is not None:
+        _orden_cache.remove(clave)
+        _orden_cache.append(clave)
+        return h
+    h = array('f', _calcular(tipo, corte, orden, fs, ventana, beta))
+    _cache[clave] = h
+    _orden_cache.append(clave)
+    if len(_orden_cache) > MAX_CACHE:
+        del _cache[_orden_cache.pop(0)]
+    return h
@@ -0,0 +1,89 @@
+# Análisis espectral continuo: cuadros solapados con ventana (Welch),
+# promedio exponencial y retención de pico.
+
+import math
+from array import array
+
+from .transformada import plan_rfft
+
+_ventanas = {}
+
+def ventana_hann(N):
+    """Tabla de la ventana de Hann para N puntos (se calcula una sola vez por tamaño)."""
+    w = _ventanas.get(N)
+    if w is None:
+        w = array('f', [0.5 - 0.5 * math.cos(2 * math.pi * n / N) for n in range(N)])
+        _ventanas[N] = w
+    return w
+
+class AnalizadorEspectro:
+    """
+    Procesa el flujo de muestras como cuadros de N puntos solapados
+    (salto = N * (1 - solape)), cada uno sin DC y con ventana de Hann.
+    Con cada cuadro actualiza de forma incremental, por bin:
+      - promedio exponencial de la potencia: P = (1 - alfa) * P + alfa * |X|^2
+      - retención de pico con caída: pico = max(|X|^2, pico * caida_pico)
+    Así todas las muestras adquiridas aportan al espectro y la lectura
+    queda estable sin recalcular nada desde cero.
+    """
+    def __init__(self, N, solape=0.5, alfa=0.25, caida_pico=0.95):
+        self.N = N
+        self.salto = max(1, int(N * (1 - solape)))
+        self.alfa = alfa
+        self.caida_pico = caida_pico
+        self.plan = plan_rfft(N)
+        self.ventana = ventana_hann(N)
+        self.anillo = array('f', [0] * N)   # últimas N muestras
+        self.pos = 0
+        self.faltan = N                     # muestras hasta el próximo cuadro
+        self.cuadro = array('f', [0] * N)
+        self.promedio = array('f', [0] * (N // 2 + 1))
+        self.pico = array('f', [0] * (N // 2 + 1))
+        self.cuadros = 0
+
+    def agregar(self, muestras):
+        """Ingresa un bloque de muestras y procesa todos los cuadros que se completen."""
+        N = self.N
+        anillo = self.anillo
+        pos = self.pos
+        faltan = self.faltan
+        for v in muestras:
+            anillo[pos] = v
+            pos += 1
+            if pos == N:
+                pos = 0
+            faltan -= 1
+            if faltan == 0:
+                self.pos = pos
+                self._procesar_cuadro()
+                faltan = self.salto
+        self.pos = pos
+        self.faltan = faltan
+
+    def _procesar_cuadro(self):
+        N = self.N
+        anillo = self.anillo
+        media = sum(anillo) / N
+        w = self.ventana
+        cuadro = self.cuadro
+        j = self.pos  # la muestra más vieja
+        for i in range(N):
+            cuadro[i] = (anillo[j] - media) * w[i]
+            j += 1
+            if j == N:
+                j = 0
+        self.plan.ejecutar(cuadro)
+
+        re = self.plan.re
+        im = self.plan.im
+        promedio = self.promedio
+        pico = self.pico
+        alfa = self.alfa if self.cuadros else 1.0
+        beta = 1 - alfa
+        caida = self.caida_pico
+        for k in range(len(promedio)):
+            p = re[k] * re[k] + im[k] * im[k]
+            promedio[k] = beta * promedio[k] + alfa * p
+            q = pico[k] * caida
+            pico[k] = p if p > q else q
+        self.cuadros += 1
@@ -0,0 +1,358 @@
+# Filtros FIR con estado: línea de retardo circular, plegado de
+# coeficientes simétricos, decimación, versión entera Q15 y convolución
+# rápida por FFT (overlap-save) para filtros largos.
+
+from array import array
+
+from .nucleos import fir_producto, fir_q15
+from .transformada import plan_fft
+
+def detectar_simetria(coef, tol=1e-9):
+    """Devuelve 1 si b[k] == b[M-1-k], -1 si b[k] == -b[M-1-k] y 0 si no hay simetría."""
+    M = len(coef)
+    if all(abs(coef[k] - coef[M - 1 - k]) <= tol for k in range(M // 2)):
+        return 1
+    if all(abs(coef[k] + coef[M - 1 - k]) <= tol for k in range(M // 2 + M % 2)):
+        return -1
+    return 0
+
+class FiltroFIR:
+    """
+    Filtro FIR con línea de retardo circular preasignada (array).
+    El estado se conserva entre llamadas, así que se puede filtrar una
+    señal en vivo bloque a bloque (process) o muestra a muestra (push).
+
+    Si los coeficientes son simétricos o antisimétricos (fase lineal) se
+    pliegan: b[k]*x[n-k] + b[M-1-k]*x[n-M+1+k] = b[k]*(x[n-k] ± x[n-M+1+k]),
+    con lo que se hace la mitad de multiplicaciones.
+    Con decimacion=D, decimar() solo calcula una de cada D salidas.
+    """
+    def __init__(self, coef, decimacion=1):
+        self.b = array('f', coef)
+        self.M = len(coef)
+        self.simetria = detectar_simetria(coef)
+        self.D = decimacion
+        # Cada muestra se guarda dos veces (en pos y pos+M) para que las
+        # últimas M muestras queden siempre contiguas: buf[pos + k] = x[n-k]
+        self.buf = array('f', [0] * (2 * self.M))
+        self.pos = 0
+        self.cuenta = 0  # muestras que faltan hasta la próxima salida decimada
+
+    def reset(self):
+        for i in range(2 * self.M):
+            self.buf[i] = 0
+        self.pos = 0
+        self.cuenta = 0
+
+    def _escribir(self, xn):
+        M = self.M
+        pos = self.pos - 1
+        if pos < 0:
+            pos = M - 1
+        self.pos = pos
+        self.buf[pos] = xn
+        self.buf[pos + M] = xn
+
+    def _calcular(self):
+        return fir_producto(self.b, self.buf, self.pos, self.M, self.simetria)
+
+    def push(self, xn):
+        """Ingresa una muestra y devuelve y[n]."""
+        self._escribir(xn)
+        return self._calcular()
+
+    def process(self, bloque, salida=None):
+        """Filtra un bloque. Si se pasa 'salida' (mismo largo) se escribe ahí sin asignar memoria."""
+        if salida is None:
+            salida = array('f', [0] * len(bloque))
+        push = self.push
+        for i in range(len(bloque)):
+            salida[i] = push(bloque[i])
+        return salida
+
+    def n_salidas(self, L):
+        """Cantidad de salidas que produce decimar() con un bloque de L muestras."""
+        if self.cuenta >= L:
+            return 0
+        return 1 + (L - 1 - self.cuenta) // self.D
+
+    def decimar(self, bloque, salida=None):
+        """
+        Filtra y decima por D: todas las muestras entran a la línea de
+        retardo pero el producto con los coeficientes solo se hace para
+        las salidas que se conservan (y[0], y[D], y[2D], ...).
+        """
+        if salida is None:
+            salida = array('f', [0] * self.n_salidas(len(bloque)))
+        D = self.D
+        j = 0
+        for i in range(len(bloque)):
+            self._escribir(bloque[i])
+            if self.cuenta == 0:
+                salida[j] = self._calcular()
+                j += 1
+                self.cuenta = D - 1
+            else:
+                self.cuenta -= 1
+        return salida
+
+class FiltroFIRQ15:
+    """
+    Versión entera de FiltroFIR: coeficientes cuantizados a Q15 (array('h'))
+    y línea de retardo array('h'). Pensado para muestras de 12 bits del ADC
+    (|x| < 2048): cada producto entra en 26 bits y el acumulador no sale de
+    los enteros pequeños de MicroPython (no hay floats ni asignaciones).
+    Si algún |b[k]| >= 1 se usan menos bits fraccionarios (self.q); con
+    |b[k]| >= 32767 no entran en 16 bits y se rechazan.
+    Las entradas se saturan a ±entrada_max, la mayor amplitud con la que
+    el acumulador no pasa de 2**30 (2047 entra con cualquier filtro de
+    ganancia razonable).
+    La salida queda en la misma escala que la entrada.
+    """
+    def __init__(self, coef):
+        self.M = len(coef)
+        self.simetria = detectar_simetria(coef)
+        q = 15
+        pico = max(abs(c) for c in coef)
+        while q > 0 and pico * (1 << q) >= 32767:
+            q -= 1
+        if pico * (1 << q) >= 32767:
+            raise ValueError("coeficientes demasiado grandes para 16 bits (|b| >= 32767)")
+        self.q = q
+        self.redondeo = (1 << q) >> 1  # 0.5 en la escala de salida (0 si q == 0)
+        self.b = array('h', [int(round(c * (1 << q))) for c in coef])
+        # Máxima |entrada| con la que el acumulador no desborda 2**30 (y que entra en 'h')
+        self.entrada_max = min(32767, ((1 << 30) - 1) // max(1, sum(abs(c) for c in self.b)))
+        self.buf = array('h', [0] * (2 * self.M))
+        self.pos = 0
+        modo = 1 if self.simetria == 1 else (2 if self.simetria == -1 else 0)
+        self.param = (self.M << 2) | modo
+
+    def reset(self):
+        for i in range(2 * self.M):
+            self.buf[i] = 0
+        self.pos = 0
+
+    def push(self, xn):
+        """Ingresa una muestra entera (saturada a ±entrada_max) y devuelve y[n] entero (redondeado)."""
+        lim = self.entrada_max
+        if xn > lim:
+            xn = lim
+        elif xn < -lim:
+            xn = -lim
+        M = self.M
+        pos = self.pos - 1
+        if pos < 0:
+            pos = M - 1
+        self.pos = pos
+        buf = self.buf
+        buf[pos] = xn
+        buf[pos + M] = xn
+        acc = fir_q15(self.b, buf, pos, self.param)
+        return (acc + self.redondeo) >> self.q
+
+    def process(self, bloque, salida=None):
+        """Filtra un bloque entero; 'salida' puede ser un array('h') preasignado."""
+        if salida is None:
+            salida = array('h', [0] * len(bloque))
+        push = self.push
+        for i in range(len(bloque)):
+            salida[i] = push(bloque[i])
+        return salida
+
+class FiltroFIRFFT:
+    """
+    Mismo filtro que FiltroFIR pero por bloques con overlap-save: cada
+    segmento de L = nfft - M + 1 muestras, con las M - 1 anteriores
+    delante, se transforma, se multiplica por H = FFT(b) y se
+    antitransforma; las primeras M - 1 salidas (con aliasing circular) se
+    descartan. El costo por muestra crece con log2(nfft) en lugar de con M.
+
+    Como x y b son reales, se filtran dos segmentos a la vez: uno en la
+    parte real y otro en la imaginaria (IFFT(FFT(a + jb)*H) = a*h + j*b*h).
+    La antitransformada usa el mismo plan: IFFT(Y) = conj(FFT(conj(Y))) / nfft,
+    con el 1/nfft ya incluido en H.
+
+    Las muestras se juntan en un buffer interno hasta completar los dos
+    segmentos, así que el largo de los segmentos solo depende de nfft y
+    no de los bloques que pase el que llama (pueden ser de cualquier
+    largo). A cambio la salida sale retrasada 'latencia' = 2L muestras:
+    process() devuelve y[n - latencia]. filtrar_senal() lo compensa para
+    una señal completa.
+    """
+    def __init__(self, coef, nfft=None):
+        M = len(coef)
+        self.M = M
+        if nfft is None:
+            nfft = _mejor_nfft(M)
+        if nfft is None or nfft <= M:
+            raise ValueError("nfft debe ser > len(coef)")
+        self.nfft = nfft
+        self.L = nfft - M + 1
+        self.latencia = 2 * self.L
+        self.plan = plan_fft(nfft)
+        self.re = array('f', [0] * nfft)
+        self.im = array('f', [0] * nfft)
+        # H = FFT(b con ceros) / nfft
+        re = self.re
+        im = self.im
+        for k in range(nfft):
+            re[k] = coef[k] / nfft if k < M else 0.0
+            im[k] = 0.0
+        self.plan.ejecutar(re, im)
+        self.h_re = array('f', re)
+        self.h_im = array('f', im)
+        self.hist = array('f', [0] * (M - 1))              # M - 1 entradas antes del par actual
+        self.entrada = array('f', [0] * self.latencia)     # par de segmentos que se está juntando
+        self.pendiente = array('f', [0] * self.latencia)   # salidas del par anterior, por entregar
+        self.i = 0
+
+    def reset(self):
+        for i in range(self.M - 1):
+            self.hist[i] = 0
+        for i in range(self.latencia):
+            self.entrada[i] = 0
+            self.pendiente[i] = 0
+        self.i = 0
+
+    def _cargar(self, dest, a):
+        # dest = x[a-M+1 .. a+L-1] de la entrada (con la historia antes del par)
+        M1 = self.M - 1
+        hist = self.hist
+        entrada = self.entrada
+        for k in range(M1):
+            idx = a - M1 + k
+            dest[k] = hist[M1 + idx] if idx < 0 else entrada[idx]
+        for k in range(self.L):
+            dest[M1 + k] = entrada[a + k]
+
+    def _filtrar_par(self):
+        M1 = self.M - 1
+        L = self.L
+        re = self.re
+        im = self.im
+        h_re = self.h_re
+        h_im = self.h_im
+        self._cargar(re, 0)
+        self._cargar(im, L)
+        self.plan.ejecutar(re, im)
+        for k in range(self.nfft):
+            # Y = X * H, conjugado para antitransformar con la FFT directa
+            xr = re[k]
+            xi = im[k]
+            re[k] = xr * h_re[k] - xi * h_im[k]
+            im[k] = -(xr * h_im[k] + xi * h_re[k])
+        self.plan.ejecutar(re, im)
+        pendiente = self.pendiente
+        for k in range(L):
+            pendiente[k] = re[M1 + k]
+            pendiente[L + k] = -im[M1 + k]
+        self._actualizar_historia()
+
+    def _actualizar_historia(self):
+        # hist = últimas M - 1 muestras de (hist + entrada)
+        M1 = self.M - 1
+        hist = self.hist
+        entrada = self.entrada
+        n = self.latencia
+        if n >= M1:
+            for k in range(M1):
+                hist[k] = entrada[n - M1 + k]
+        else:
+            for k in range(M1 - n):
+                hist[k] = hist[k + n]
+            for k in range(n):
+                hist[M1 - n + k] = entrada[k]
+
+    def process(self, bloque, salida=None):
+        """
+        Ingresa un bloque (cualquier largo) y devuelve la misma cantidad de
+        salidas, retrasadas 'latencia' muestras; 'salida' puede ser un
+        array('f') preasignado.
+        """
+        n = len(bloque)
+        if salida is None:
+            salida = array('f', [0] * n)
+        entrada = self.entrada
+        pendiente = self.pendiente
+        lat = self.latencia
+        i = self.i
+        j = 0
+        while j < n:
+            k = min(n - j, lat - i)
+            for t in range(k):
+                salida[j + t] = pendiente[i + t]
+                entrada[i + t] = bloque[j + t]
+            i += k
+            j += k
+            if i == lat:
+                self._filtrar_par()
+                i = 0
+        self.i = i
+        return salida
+
+
+def filtrar_senal(filtro, x):
+    """
+    Filtra la señal completa x y devuelve y alineada con x (y[n] para
+    n = 0..len(x)-1), compensando la latencia de FiltroFIRFFT con ceros
+    al final. Con FiltroFIR es lo mismo que process().
+    """
+    y = filtro.process(x)
+    lat = getattr(filtro, "latencia", 0)
+    if lat == 0:
+        return y
+    resto = filtro.process(array('f', [0] * lat))
+    n = len(x)
+    return (y + resto)[lat:lat + n]
+
+
+# ---------- Elección entre convolución directa y por FFT ----------
+# Costos relativos medidos en la PC con los núcleos en Python puro: una
+# multiplicación-acumulación del FIR directo, una mariposa de la FFT y el
+# trabajo por punto de cada par de segmentos (cargar, multiplicar por H,
+# copiar). Con los núcleos nativos del ESP32 conviene volver a medirlos.
+COSTO_MAC = 1.0
+COSTO_MARIPOSA = 10.0
+COSTO_PUNTO = 15.0
+NFFT_MAX = 4096  # re, im, H y los buffers de entrada/salida: ~24 bytes por punto
+
+def costo_directo(coef):
+    """Costo por muestra de FiltroFIR (con plegado si los coeficientes son simétricos)."""
+    M = len(coef)
+    return COSTO_MAC * ((M + 1) // 2 if detectar_simetria(coef) else M)
+
+def costo_fft(M, nfft):
+    """Costo por muestra de FiltroFIRFFT: un par de FFT cada 2L muestras."""
+    L = nfft - M + 1
+    bits = 0
+    while (1 << bits) < nfft:
+        bits += 1
+    por_par = 2 * COSTO_MARIPOSA * (nfft // 2) * bits + COSTO_PUNTO * nfft
+    return por_par / (2 * L)
+
+def _mejor_nfft(M, latencia_max=None):
+    # La potencia de 2 (> M, <= NFFT_MAX) de menor costo por muestra cuya latencia
+    # 2L no pase de latencia_max; None si no hay ninguna
+    mejor = None
+    nfft = 2
+    while nfft <= M:
+        nfft <<= 1
+    while nfft <= NFFT_MAX:
+        if latencia_max is not None and 2 * (nfft - M + 1) > latencia_max:
+            break
+        if mejor is None or costo_fft(M, nfft) < costo_fft(M, mejor):
+            mejor = nfft
+        nfft <<= 1
+    return mejor
+
+def crear_filtro(coef, latencia_max=None):
+    """
+    FiltroFIR o FiltroFIRFFT según cuál haga menos operaciones por muestra.
+    latencia_max limita el retraso de FiltroFIRFFT (muestras) para usos en
+    vivo; sin límite elige el nfft más barato hasta NFFT_MAX.
+    """
+    nfft = _mejor_nfft(len(coef), latencia_max)
+    if nfft is not None and costo_fft(len(coef), nfft) < costo_directo(coef):
+        return FiltroFIRFFT(coef, nfft)
+    return FiltroFIR(coef)
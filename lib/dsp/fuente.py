@@ -0,0 +1,107 @@
+# Fuente de señal AM (o tono, con índice 0) por recurrencia de fasores, con
+# caché del cuadro y de su espectro.
+
+import math
+from array import array
+
+from .nucleos import oscilador_am
+from .transformada import plan_rfft
+
+
+class FuenteAM:
+    """
+    Genera (1 + m*cos(wm*n)) * cos(wp*n) en un buffer de N muestras
+    preasignado. En lugar de dos cosenos por muestra gira dos fasores
+    (c + js) *= e^(jw): cuatro multiplicaciones por oscilador y muestra.
+    Al final de cada cuadro los fasores se vuelven a llevar a módulo 1 para
+    que el redondeo no se acumule.
+
+    continuo=False: cada cuadro empieza en fase 0, como si se generara desde
+    t = 0; mientras no cambien los parámetros cuadro() devuelve el mismo
+    buffer sin recalcular nada.
+    continuo=True: cada cuadro sigue en la fase donde terminó el anterior
+    (flujo sin saltos) y configurar() cambia frecuencias o índice en vivo
+    sin cortar la fase.
+
+    'version' cambia cada vez que el contenido del buffer cambia; espectro()
+    la usa para calcular la FFT solo una vez por cuadro.
+    """
+    def __init__(self, fs, N, f_portadora, f_modulante, indice, continuo=False):
+        self.fs = fs
+        self.N = N
+        self.continuo = continuo
+        self.señal = array('f', [0] * N)
+        self.osc = array('f', [1, 0, 1, 0, 1, 0, 1, 0])
+        self.f_portadora = None
+        self.f_modulante = None
+        self.indice = indice
+        self.version = 0
+        self._generado = False
+        self._plan = None
+        self._mag = None
+        self._version_mag = -1
+        self.configurar(f_portadora, f_modulante, indice)
+
+    def configurar(self, f_portadora=None, f_modulante=None, indice=None):
+        """Cambia los parámetros que se pasen; los demás quedan como estaban."""
+        osc = self.osc
+        if f_portadora is not None and f_portadora != self.f_portadora:
+            w = 2 * math.pi * f_portadora / self.fs
+            osc[2] = math.cos(w)
+            osc[3] = math.sin(w)
+            self.f_portadora = f_portadora
+            self._generado = False
+        if f_modulante is not None and f_modulante != self.f_modulante:
+            w = 2 * math.pi * f_modulante / self.fs
+            osc[6] = math.cos(w)
+            osc[7] = math.sin(w)
+            self.f_modulante = f_modulante
+            self._generado = False
+        if indice is not None and indice != self.indice:
+            self.indice = indice
+            self._generado = False
+
+    def reiniciar(self):
+        """Vuelve los dos osciladores a fase 0."""
+        osc = self.osc
+        osc[0] = 1
+        osc[1] = 0
+        osc[4] = 1
+        osc[5] = 0
+        self._generado = False
+
+    def cuadro(self):
+        """Devuelve el buffer con el cuadro actual (recalculado solo si hace falta)."""
+        if self.continuo:
+            self._generar()
+        elif not self._generado:
+            self.reiniciar()
+            self._generar()
+            self._generado = True
+        return self.señal
+
+    def _generar(self):
+        osc = self.osc
+        oscilador_am(self.señal, self.N, osc, self.indice)
+        # Módulo 1 otra vez: el error de redondeo del giro crece con cada muestra
+        for i in (0, 4):
+            r = math.sqrt(osc[i] * osc[i] + osc[i + 1] * osc[i + 1])
+            osc[i] /= r
+            osc[i + 1] /= r
+        self.version += 1
+
+    def espectro(self):
+        """|X[k]|, k = 0..N/2-1, del último cuadro; la FFT se calcula una vez por cuadro."""
+        if self._plan is None:
+            self._plan = plan_rfft(self.N)
+            self._mag = array('f', [0] * (self.N // 2))
+        if self._version_mag != self.version:
+            plan = self._plan
+            mag = self._mag
+            plan.ejecutar(self.señal)
+            re = plan.re
+            im = plan.im
+            for k in range(len(mag)):
+                mag[k] = math.sqrt(re[k] * re[k] + im[k] * im[k])
+            self._version_mag = self.version
+        return self._mag
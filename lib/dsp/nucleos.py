@@ -0,0 +1,213 @@
+# Núcleos DSP en Python puro: los lazos internos de la FFT, el FIR y la
+# síntesis AM. Si el port tiene los emisores de MicroPython se reemplazan
+# por las versiones compiladas de _nativo.py, que tienen la misma firma y
+# dan los mismos resultados.
+
+import math
+
+
+def permutar(re, im, swap_i, swap_j):
+    # Reordenamiento bit-reversal con los pares precalculados
+    for s in range(len(swap_i)):
+        i = swap_i[s]
+        j = swap_j[s]
+        re[i], re[j] = re[j], re[i]
+        im[i], im[j] = im[j], im[i]
+
+def fft_etapas(re, im, tw_re, tw_im, N):
+    # Mariposas radix-2 de todas las etapas (entrada ya permutada)
+    size = 2
+    while size <= N:
+        half = size >> 1
+        paso = N // size
+        for i in range(0, N, size):
+            k = 0
+            for j in range(i, i + half):
+                l = j + half
+                wr = tw_re[k]
+                wi = tw_im[k]
+                tr = wr * re[l] - wi * im[l]
+                ti = wr * im[l] + wi * re[l]
+                re[l] = re[j] - tr
+                im[l] = im[j] - ti
+                re[j] += tr
+                im[j] += ti
+                k += paso
+        size <<= 1
+
+def q15_permutar(re, im, swaps, n):
+    # swaps = [i0, j0, i1, j1, ...]
+    for s in range(n):
+        i = swaps[2 * s]
+        j = swaps[2 * s + 1]
+        re[i], re[j] = re[j], re[i]
+        im[i], im[j] = im[j], im[i]
+
+def q15_pico(re, im, N):
+    pico = 0
+    for i in range(N):
+        v = re[i]
+        if v < 0:
+            v = -v
+        if v > pico:
+            pico = v
+        v = im[i]
+        if v < 0:
+            v = -v
+        if v > pico:
+            pico = v
+    return pico
+
+def q15_mitad(re, im, N):
+    for i in range(N):
+        re[i] >>= 1
+        im[i] >>= 1
+
+def q15_etapa(re, im, tw, param):
+    # param = (log2(N) << 8) | log2(size); tw = [wr0, wi0, wr1, wi1, ...] en Q15
+    bits = param >> 8
+    bits_size = param & 0xFF
+    N = 1 << bits
+    size = 1 << bits_size
+    half = size >> 1
+    paso = 1 << (bits - bits_size)
+    for i in range(0, N, size):
+        k = 0
+        for j in range(i, i + half):
+            l = j + half
+            wr = tw[2 * k]
+            wi = tw[2 * k + 1]
+            tr = (wr * re[l] - wi * im[l]) >> 15
+            ti = (wr * im[l] + wi * re[l]) >> 15
+            re[l] = re[j] - tr
+            im[l] = im[j] - ti
+            re[j] += tr
+            im[j] += ti
+            k += paso
+
+def fir_producto(b, buf, pos, M, simetria):
+    # y[n] = sumatoria de b[k]*x[n-k], con buf[pos + k] = x[n-k]; plegado si hay simetría
+    yn = 0.0
+    if simetria == 1:
+        ultimo = pos + M - 1
+        for k in range(M // 2):
+            yn += b[k] * (buf[pos + k] + buf[ultimo - k])
+        if M % 2:
+            yn += b[M // 2] * buf[pos + M // 2]
+    elif simetria == -1:
+        ultimo = pos + M - 1
+        for k in range(M // 2):
+            yn += b[k] * (buf[pos + k] - buf[ultimo - k])
+        # en un FIR antisimétrico de largo impar el coeficiente central es 0
+    else:
+        for k in range(M):
+            yn += b[k] * buf[pos + k]
+    return yn
+
+def fir_q15(b, buf, pos, param):
+    # Igual que fir_producto en enteros; param = (M << 2) | (0 = sin simetría, 1 = simétrico, 2 = antisimétrico)
+    M = param >> 2
+    modo = param & 3
+    acc = 0
+    if modo == 0:
+        for k in range(M):
+            acc += b[k] * buf[pos + k]
+        return acc
+    ultimo = pos + M - 1
+    for k in range(M // 2):
+        if modo == 1:
+            acc += b[k] * (buf[pos + k] + buf[ultimo - k])
+        else:
+            acc += b[k] * (buf[pos + k] - buf[ultimo - k])
+    if modo == 1 and M % 2:
+        acc += b[M // 2] * buf[pos + M // 2]
+    return acc
+
+def dft_directa(signal):
+    N = len(signal)
+    mean = sum(signal) / N
+    signal = [s - mean for s in signal]  # Centrado
+    spectrum = []
+    for k in range(N // 2):
+        re = 0
+        im = 0
+        for n in range(N):
+            angle = -2 * math.pi * k * n / N
+            re += signal[n] * math.cos(angle)
+            im += signal[n] * math.sin(angle)
+        mag = math.sqrt(re ** 2 + im ** 2)
+        spectrum.append(mag)
+    return spectrum
+
+def goertzel(x, i0, i1, c, estado, j, centro):
+    # Recurrencia de Goertzel s[n] = x[n] + c*s[n-1] - s[n-2] sobre x[i0:i1];
+    # el estado (s[n-1], s[n-2]) del tono queda en estado[j], estado[j + 1]
+    s1 = estado[j]
+    s2 = estado[j + 1]
+    for i in range(i0, i1):
+        s0 = (x[i] - centro) + c * s1 - s2
+        s2 = s1
+        s1 = s0
+    estado[j] = s1
+    estado[j + 1] = s2
+
+def mezclar_decimar(x, g_re, g_im, rot_re, rot_im, re, im, D):
+    # Salida m del pasabanda complejo g (pasabajos por la portadora) en n = m*D + M - 1,
+    # llevada a banda base con rot: re[m] + j*im[m]
+    M = len(g_re)
+    n = M - 1
+    for m in range(len(re)):
+        ar = 0.0
+        ai = 0.0
+        for k in range(M):
+            v = x[n - k]
+            ar += g_re[k] * v
+            ai += g_im[k] * v
+        re[m] = ar * rot_re[m] - ai * rot_im[m]
+        im[m] = ar * rot_im[m] + ai * rot_re[m]
+        n += D
+
+def oscilador_am(señal, n, osc, m):
+    # AM por recurrencia de fasores: osc = [c_p, s_p, cw_p, sw_p, c_m, s_m, cw_m, sw_m]
+    # (cos/sen de la fase actual y del giro por muestra de portadora y modulante).
+    # Al terminar osc queda en la fase de la muestra n: el cuadro siguiente sigue sin salto.
+    cp = osc[0]
+    sp = osc[1]
+    cwp = osc[2]
+    swp = osc[3]
+    cm = osc[4]
+    sm = osc[5]
+    cwm = osc[6]
+    swm = osc[7]
+    for k in range(n):
+        señal[k] = (1 + m * cm) * cp
+        t = cp * cwp - sp * swp
+        sp = sp * cwp + cp * swp
+        cp = t
+        t = cm * cwm - sm * swm
+        sm = sm * cwm + cm * swm
+        cm = t
+    osc[0] = cp
+    osc[1] = sp
+    osc[4] = cm
+    osc[5] = sm
+
+
+try:
+    from . import _nativo
+except (ImportError, SyntaxError):
+    _nativo = None
+
+if _nativo:
+    permutar = _nativo.permutar
+    fft_etapas = _nativo.fft_etapas
+    q15_permutar = _nativo.q15_permutar
+    q15_pico = _nativo.q15_pico
+    q15_mitad = _nativo.q15_mitad
+    q15_etapa = _nativo.q15_etapa
+    fir_producto = _nativo.fir_producto
+    fir_q15 = _nativo.fir_q15
+    dft_directa = _nativo.dft_directa
+    goertzel = _nativo.goertzel
+    mezclar_decimar = _nativo.mezclar_decimar
+    oscilador_am = _nativo.oscilador_am
@@ -0,0 +1,152 @@
+# Respuesta en frecuencia H(e^jw) de un FIR: se calcula una vez por juego
+# de coeficientes y se sirve desde tablas (magnitud, fase, retardo de grupo).
+
+import math
+from array import array
+
+from .transformada import plan_fft
+
+
+class RespuestaFrecuencia:
+    """
+    H(e^jw) de los coeficientes 'coef' en N/2 + 1 frecuencias de 0 a fs/2,
+    con una FFT de N puntos de los coeficientes con ceros (N*log2(N) en
+    lugar de N*M senos y cosenos de la DFT directa).
+
+    La magnitud, la fase desenvuelta y el retardo de grupo se calculan
+    recién cuando se piden y quedan guardados; vista() devuelve cualquiera
+    de ellos remuestreado a 'puntos' valores (una columna por pixel, por
+    ejemplo) y también guarda el resultado. Las tablas son compartidas:
+    no modificarlas.
+    """
+    def __init__(self, coef, N=512):
+        if N < len(coef):
+            raise ValueError("N debe ser >= len(coef)")
+        self.coef = array('f', coef)
+        self.N = N
+        self.bins = N // 2 + 1
+        re = array('f', [0] * N)
+        im = array('f', [0] * N)
+        for k in range(len(coef)):
+            re[k] = coef[k]
+        self.plan = plan_fft(N)
+        self.plan.ejecutar(re, im)
+        self.re = array('f', re[:self.bins])
+        self.im = array('f', im[:self.bins])
+        self._tablas = {}
+        self._vistas = {}
+
+    def frecuencias(self, fs):
+        """Frecuencia en Hz de cada bin para una frecuencia de muestreo fs."""
+        return [k * fs / self.N for k in range(self.bins)]
+
+    def magnitud(self):
+        m = self._tablas.get("magnitud")
+        if m is None:
+            re = self.re
+            im = self.im
+            m = array('f', [math.sqrt(re[k] * re[k] + im[k] * im[k]) for k in range(self.bins)])
+            self._tablas["magnitud"] = m
+        return m
+
+    def magnitud_db(self, piso=-120.0):
+        m = self._tablas.get("magnitud_db")
+        if m is None:
+            m = array('f', [20 * math.log10(v) if v > 0 else piso for v in self.magnitud()])
+            for k in range(len(m)):
+                if m[k] < piso:
+                    m[k] = piso
+            self._tablas["magnitud_db"] = m
+        return m
+
+    def fase(self):
+        """Fase desenvuelta en radianes (sin los saltos de 2*pi de atan2)."""
+        f = self._tablas.get("fase")
+        if f is None:
+            re = self.re
+            im = self.im
+            f = array('f', [0] * self.bins)
+            vuelta = 0.0
+            anterior = 0.0
+            for k in range(self.bins):
+                p = math.atan2(im[k], re[k])
+                d = p - anterior
+                if d > math.pi:
+                    vuelta -= 2 * math.pi
+                elif d < -math.pi:
+                    vuelta += 2 * math.pi
+                anterior = p
+                f[k] = p + vuelta
+            self._tablas["fase"] = f
+        return f
+
+    def retardo_grupo(self):
+        """
+        Retardo de grupo en muestras: tau = Re{FFT(n*h[n]) / FFT(h[n])},
+        exacto, sin derivar la fase. En los ceros de H se repite el valor
+        anterior. Un FIR simétrico de M coeficientes da (M - 1) / 2.
+        """
+        t = self._tablas.get("retardo")
+        if t is None:
+            N = self.N
+            re = array('f', [0] * N)
+            im = array('f', [0] * N)
+            coef = self.coef
+            for n in range(len(coef)):
+                re[n] = n * coef[n]
+            self.plan.ejecutar(re, im)
+            hr = self.re
+            hi = self.im
+            piso = 1e-6 * max(self.magnitud()) ** 2
+            t = array('f', [0] * self.bins)
+            anterior = (len(coef) - 1) / 2
+            for k in range(self.bins):
+                p = hr[k] * hr[k] + hi[k] * hi[k]
+                if p > piso:
+                    anterior = (re[k] * hr[k] + im[k] * hi[k]) / p
+                t[k] = anterior
+            self._tablas["retardo"] = t
+        return t
+
+    def vista(self, nombre, puntos):
+        """
+        "magnitud", "magnitud_db", "fase" o "retardo" en 'puntos' valores
+        equiespaciados de 0 a fs/2 (interpolación lineal entre bins).
+        """
+        clave = (nombre, puntos)
+        v = self._vistas.get(clave)
+        if v is None:
+            if nombre == "magnitud":
+                tabla = self.magnitud()
+            elif nombre == "magnitud_db":
+                tabla = self.magnitud_db()
+            elif nombre == "fase":
+                tabla = self.fase()
+            elif nombre == "retardo":
+                tabla = self.retardo_grupo()
+            else:
+                raise ValueError("vista desconocida: " + str(nombre))
+            v = array('f', [0] * puntos)
+            paso = (self.bins - 1) / (puntos - 1) if puntos > 1 else 0
+            for i in range(puntos):
+                pos = i * paso
+                k = int(pos)
+                if k >= self.bins - 1:
+                    v[i] = tabla[self.bins - 1]
+                else:
+                    a = pos - k
+                    v[i] = tabla[k] * (1 - a) + tabla[k + 1] * a
+            self._vistas[clave] = v
+        return v
+
+
+_respuestas = {}
+
+def respuesta_frecuencia(coef, N=512):
+    """Devuelve la respuesta de estos coeficientes, calculándola solo la primera vez."""
+    clave = (tuple(coef), N)
+    r = _respuestas.get(clave)
+    if r is None:
+        r = RespuestaFrecuencia(coef, N)
+        _respuestas[clave] = r
+    return r
@@ -0,0 +1,81 @@
+# Detección de tonos con un banco de filtros de Goertzel: magnitud en unas
+# pocas frecuencias elegidas sin calcular la FFT completa.
+
+import math
+from array import array
+
+from .nucleos import goertzel
+
+
+class DetectorTonos:
+    """
+    Un filtro de Goertzel por frecuencia, alimentado muestra a muestra con
+    el flujo del ADC (los bloques que entran no tienen que coincidir con
+    los de N muestras: el estado pasa de un bloque al siguiente).
+    Cada N muestras se obtiene la amplitud de cada tono y se reinicia.
+
+    Costo: una multiplicación y dos sumas por muestra y por tono, y dos
+    floats de estado por tono; no guarda muestras. Para K tonos conviene
+    frente a una FFT de N puntos mientras K < log2(N) aproximadamente.
+    La frecuencia no tiene que caer en un bin: se usa w = 2*pi*f/fs.
+    El ancho de cada filtro es fs/N Hz.
+    """
+    def __init__(self, frecuencias, fs, N, centro=2048):
+        self.frecuencias = tuple(frecuencias)
+        self.fs = fs
+        self.N = N
+        K = len(self.frecuencias)
+        self.coef = array('f', [2 * math.cos(2 * math.pi * f / fs) for f in self.frecuencias])
+        self.estado = array('f', [0] * (2 * K))
+        self.amplitud = array('f', [0] * K)   # amplitud del último bloque (mismas unidades que x)
+        self.centro = centro                  # continua a restar: media del bloque anterior
+        self.suma = 0
+        self.cuenta = 0
+        self.bloques = 0
+
+    def resolucion(self):
+        """Ancho de cada filtro en Hz."""
+        return self.fs / self.N
+
+    def agregar(self, muestras):
+        """Ingresa muestras; devuelve cuántos bloques de N se completaron."""
+        L = len(muestras)
+        i = 0
+        completos = 0
+        while i < L:
+            fin = min(L, i + self.N - self.cuenta)
+            for j in range(len(self.coef)):
+                goertzel(muestras, i, fin, self.coef[j], self.estado, 2 * j, self.centro)
+            suma = self.suma
+            for n in range(i, fin):
+                suma += muestras[n]
+            self.suma = suma
+            self.cuenta += fin - i
+            i = fin
+            if self.cuenta == self.N:
+                self._cerrar_bloque()
+                completos += 1
+        return completos
+
+    def _cerrar_bloque(self):
+        # |X|^2 = s1^2 + s2^2 - c*s1*s2; un seno de amplitud A da |X| = A*N/2
+        estado = self.estado
+        escala = 2 / self.N
+        for j in range(len(self.coef)):
+            s1 = estado[2 * j]
+            s2 = estado[2 * j + 1]
+            p = s1 * s1 + s2 * s2 - self.coef[j] * s1 * s2
+            self.amplitud[j] = math.sqrt(p) * escala if p > 0 else 0
+            estado[2 * j] = 0
+            estado[2 * j + 1] = 0
+        self.centro = self.suma / self.N
+        self.suma = 0
+        self.cuenta = 0
+        self.bloques += 1
+
+    def nivel_db(self, j, referencia=2047):
+        """Nivel del tono j en dB respecto de 'referencia' (por defecto el fondo de escala del ADC)."""
+        a = self.amplitud[j]
+        if a <= 0:
+            return -120.0
+        return 20 * math.log10(a / referencia)
@@ -0,0 +1,190 @@
+# FFT radix-2 con planes reutilizables (tablas precalculadas por tamaño),
+# FFT de entrada real y FFT entera Q15. Funciona sobre array/listas, sin numpy.
+
+import math
+from array import array
+
+from .nucleos import permutar, fft_etapas, q15_permutar, q15_pico, q15_mitad, q15_etapa
+
+def es_potencia_de_2(N):
+    return N > 0 and (N & (N - 1)) == 0
+
+def bit_reverse(x, bits):
+    result = 0
+    for i in range(bits):
+        if x & (1 << i):
+            result |= 1 << (bits - 1 - i)
+    return result
+
+# --- Plan de FFT: tablas precalculadas por tamaño ---
+class PlanFFT:
+    """
+    Precalcula, una sola vez para un tamaño N (potencia de 2), la
+    permutación bit-reversal y la tabla de twiddles W_N^k = e^(-2πjk/N).
+    Después transforma cualquier cantidad de cuadros in-place sobre dos
+    buffers (parte real e imaginaria), sin llamar a cos/sin ni crear listas.
+    """
+    def __init__(self, N):
+        bits = int(math.log2(N))
+        if N < 2 or (1 << bits) != N:
+            raise ValueError("N debe ser potencia de 2")
+        self.N = N
+        self.bits = bits
+
+        # Pares (i, j) a intercambiar para el reordenamiento bit-reversal
+        swap_i = []
+        swap_j = []
+        for i in range(N):
+            j = bit_reverse(i, bits)
+            if i < j:
+                swap_i.append(i)
+                swap_j.append(j)
+        self.swap_i = array('H', swap_i)
+        self.swap_j = array('H', swap_j)
+
+        # Twiddles para k = 0..N/2-1 (cada etapa usa un subconjunto con paso N/size)
+        half = N // 2
+        self.tw_re = array('f', [math.cos(-2 * math.pi * k / N) for k in range(half)])
+        self.tw_im = array('f', [math.sin(-2 * math.pi * k / N) for k in range(half)])
+
+        # Buffers de trabajo reutilizables
+        self.re = array('f', [0] * N)
+        self.im = array('f', [0] * N)
+
+    def ejecutar(self, re, im):
+        """FFT in-place sobre re/im (listas o arrays de largo N)."""
+        permutar(re, im, self.swap_i, self.swap_j)
+        fft_etapas(re, im, self.tw_re, self.tw_im, self.N)
+
+_planes = {}
+
+def plan_fft(N):
+    """Devuelve el plan para N puntos, creándolo solo la primera vez."""
+    plan = _planes.get(N)
+    if plan is None:
+        plan = PlanFFT(N)
+        _planes[N] = plan
+    return plan
+
+# --- FFT de entrada real (rfft) ---
+class PlanRFFT:
+    """
+    FFT de N muestras reales: se empaquetan como N/2 complejas
+    z[n] = x[2n] + j*x[2n+1], se hace una FFT de N/2 puntos y un paso de
+    separación recupera X[k] para k = 0..N/2 (la mitad no redundante).
+    Cuesta aproximadamente la mitad que la FFT compleja de N puntos.
+    """
+    def __init__(self, N):
+        if N < 4 or not es_potencia_de_2(N):
+            raise ValueError("N debe ser potencia de 2 y >= 4")
+        self.N = N
+        M = N // 2
+        self.M = M
+        self.plan = plan_fft(M)
+
+        # Twiddles W_N^k para el paso de separación, k = 0..N/2
+        self.w_re = array('f', [math.cos(-2 * math.pi * k / N) for k in range(M + 1)])
+        self.w_im = array('f', [math.sin(-2 * math.pi * k / N) for k in range(M + 1)])
+
+        # Salida: N/2 + 1 bins (DC .. Nyquist)
+        self.re = array('f', [0] * (M + 1))
+        self.im = array('f', [0] * (M + 1))
+
+    def ejecutar(self, x):
+        """Transforma x (N reales) y deja el resultado en self.re / self.im."""
+        M = self.M
+        zr = self.plan.re
+        zi = self.plan.im
+        for n in range(M):
+            zr[n] = x[2 * n]
+            zi[n] = x[2 * n + 1]
+        self.plan.ejecutar(zr, zi)
+
+        w_re = self.w_re
+        w_im = self.w_im
+        out_re = self.re
+        out_im = self.im
+        for k in range(M + 1):
+            a = k % M
+            b = (M - k) % M
+            # Parte par E = (Z[k] + conj(Z[M-k])) / 2
+            er = (zr[a] + zr[b]) * 0.5
+            ei = (zi[a] - zi[b]) * 0.5
+            # Parte impar O = (Z[k] - conj(Z[M-k])) / 2j
+            o_r = (zi[a] + zi[b]) * 0.5
+            o_i = (zr[b] - zr[a]) * 0.5
+            # X[k] = E + W_N^k * O
+            wr = w_re[k]
+            wi = w_im[k]
+            out_re[k] = er + wr * o_r - wi * o_i
+            out_im[k] = ei + wr * o_i + wi * o_r
+
+_planes_reales = {}
+
+def plan_rfft(N):
+    """Devuelve el plan real para N puntos, creándolo solo la primera vez."""
+    plan = _planes_reales.get(N)
+    if plan is None:
+        plan = PlanRFFT(N)
+        _planes_reales[N] = plan
+    return plan
+
+# --- FFT en punto fijo (Q15) ---
+class PlanFFTQ15:
+    """
+    FFT entera sobre buffers array('i'), twiddles en Q15 (array('h')).
+    Las muestras de 12 bits del ADC (sin DC: -2048..2047) entran directo.
+    Escalado por bloque: antes de cada etapa, si algún valor supera
+    LIMITE se divide todo el bloque por 2 y se suma 1 a self.exponente,
+    así los productos entran en un entero pequeño de MicroPython (31 bits)
+    y no hay desborde. El resultado real es X[k] = (re + j*im) * 2**exponente.
+    """
+    LIMITE = 1 << 13
+
+    def __init__(self, N):
+        bits = int(math.log2(N))
+        if N < 2 or (1 << bits) != N:
+            raise ValueError("N debe ser potencia de 2")
+        self.N = N
+        self.bits = bits
+        # Pares a intercambiar y twiddles intercalados (formato de los núcleos viper)
+        swaps = []
+        for i in range(N):
+            j = bit_reverse(i, bits)
+            if i < j:
+                swaps.append(i)
+                swaps.append(j)
+        self.swaps = array('H', swaps)
+        tw = []
+        for k in range(N // 2):
+            tw.append(int(round(32767 * math.cos(-2 * math.pi * k / N))))
+            tw.append(int(round(32767 * math.sin(-2 * math.pi * k / N))))
+        self.tw = array('h', tw)
+
+        self.re = array('i', [0] * N)
+        self.im = array('i', [0] * N)
+        self.exponente = 0
+
+    def ejecutar(self, re, im):
+        """FFT in-place sobre re/im enteros; deja el exponente de bloque en self.exponente."""
+        N = self.N
+        self.exponente = 0
+        q15_permutar(re, im, self.swaps, len(self.swaps) >> 1)
+        for bits_size in range(1, self.bits + 1):
+            # Escalado de bloque antes de cada etapa
+            while q15_pico(re, im, N) >= self.LIMITE:
+                q15_mitad(re, im, N)
+                self.exponente += 1
+            q15_etapa(re, im, self.tw, (self.bits << 8) | bits_size)
+
+    def magnitud(self, k):
+        """|X[k]| aproximado en enteros (alfa-max + beta-min, error < 7%), sin exponente."""
+        a = self.re[k]
+        b = self.im[k]
+        if a < 0:
+            a = -a
+        if b < 0:
+            b = -b
+        if a < b:
+            a, b = b, a
+        return a + (b >> 2) + (b >> 3)
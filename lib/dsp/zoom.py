@@ -0,0 +1,115 @@
+# Zoom FFT: espectro de alta resolución de una sola banda (f_inicio, f_fin)
+# sin calcular la FFT enorme de toda la señal.
+
+import math
+from array import array
+
+from .nucleos import mezclar_decimar
+from .transformada import plan_fft
+from .espectro import ventana_hann
+from .diseno import disenar_fir
+
+# Límites para que el motor entre en la RAM del ESP32: g_re/g_im ocupan 8 bytes
+# por coeficiente y calcular() necesita muestras_necesarias() floats de entrada
+# (una banda de 1 Hz a fs = 5000 pediría 16501 coeficientes y ~654k muestras).
+D_MAX = 1024
+M_MAX = 2049
+MUESTRAS_MAX = 32768  # 128 KB de array('f')
+
+
+class ZoomFFT:
+    """
+    Lleva la banda (f_inicio, f_fin) a continua con un oscilador complejo,
+    la filtra con un pasabajos, se queda con una de cada D muestras y
+    hace una FFT chica de N puntos con ventana de Hann. La resolución es
+    fs / (D * N) Hz: la de una FFT de D*N puntos, con N*M + FFT(N)
+    operaciones en lugar de FFT(D*N).
+
+    Mezclar y filtrar se hace en un solo paso: con g[k] = h[k]*e^(jwc*k)
+    (un pasabanda complejo) la salida en n es e^(-jwc*n) * sum g[k]*x[n-k],
+    y solo se calcula en las N muestras que sobreviven a la decimación.
+    Las tablas (g, la rotación con la ventana incluida, el plan de FFT)
+    se calculan una vez por banda; zoom_fft() guarda un motor por banda.
+    Si D, M o las muestras de entrada pasan de D_MAX, M_MAX o MUESTRAS_MAX
+    (banda muy angosta o N muy grande) da ValueError.
+    """
+    def __init__(self, fs, f_inicio, f_fin, N=256, sobremuestreo=2):
+        if not 0 <= f_inicio < f_fin <= fs / 2:
+            raise ValueError("banda fuera de 0..fs/2")
+        self.fs = fs
+        self.f_inicio = f_inicio
+        self.f_fin = f_fin
+        self.N = N
+        B = f_fin - f_inicio
+        self.fc = (f_inicio + f_fin) / 2
+        # Tasa compleja fs/D >= sobremuestreo * B: lo que se pliega al decimar cae fuera de la banda
+        self.D = max(1, int(fs / (sobremuestreo * B)))
+        fs_d = fs / self.D
+        # Banda de paso B/2, de rechazo desde fs_d - B/2 (Hamming: M ~ 3.3 / ancho de transición)
+        transicion = (fs_d - B) / fs
+        M = int(3.3 / transicion) | 1 if self.D > 1 else 1
+        self.M = M
+        muestras = (N - 1) * self.D + M
+        if self.D > D_MAX or M > M_MAX or muestras > MUESTRAS_MAX:
+            raise ValueError("banda de %g Hz demasiado angosta para N = %d: D = %d (máx %d), "
+                             "M = %d (máx %d), %d muestras (máx %d)" % (
+                                 B, N, self.D, D_MAX, M, M_MAX, muestras, MUESTRAS_MAX))
+        h = disenar_fir("pasabajos", fs_d / 2, M - 1, fs) if M > 1 else array('f', [1.0])
+        self.h = h
+
+        wc = 2 * math.pi * self.fc / fs
+        self.g_re = array('f', [h[k] * math.cos(wc * k) for k in range(M)])
+        self.g_im = array('f', [h[k] * math.sin(wc * k) for k in range(M)])
+        w = ventana_hann(N)
+        self.rot_re = array('f', [0] * N)
+        self.rot_im = array('f', [0] * N)
+        for m in range(N):
+            fase = -wc * (m * self.D + M - 1)
+            self.rot_re[m] = w[m] * math.cos(fase)
+            self.rot_im[m] = w[m] * math.sin(fase)
+        self.escala = 2 / sum(w)   # |X| -> amplitud del seno
+
+        self.plan = plan_fft(N)
+        self.re = array('f', [0] * N)
+        self.im = array('f', [0] * N)
+        # Bins (después de centrar la FFT) que caen dentro de la banda
+        self.df = fs_d / N
+        self.i0 = N // 2 + math.ceil((f_inicio - self.fc) / self.df - 1e-9)
+        self.i1 = N // 2 + math.floor((f_fin - self.fc) / self.df + 1e-9)
+        self.amplitud = array('f', [0] * (self.i1 - self.i0 + 1))
+        self.f0 = self.fc + (self.i0 - N // 2) * self.df   # frecuencia de amplitud[0]
+
+    def muestras_necesarias(self):
+        return (self.N - 1) * self.D + self.M
+
+    def resolucion(self):
+        return self.df
+
+    def calcular(self, x):
+        """Amplitud de cada bin de la banda (de f0 en pasos de df) para las primeras muestras de x."""
+        if len(x) < self.muestras_necesarias():
+            raise ValueError("se necesitan %d muestras" % self.muestras_necesarias())
+        N = self.N
+        re = self.re
+        im = self.im
+        mezclar_decimar(x, self.g_re, self.g_im, self.rot_re, self.rot_im, re, im, self.D)
+        self.plan.ejecutar(re, im)
+        amplitud = self.amplitud
+        escala = self.escala
+        mitad = N // 2
+        for i in range(len(amplitud)):
+            k = (self.i0 + i - mitad) % N   # FFT centrada: el bin N/2 es fc
+            amplitud[i] = math.sqrt(re[k] * re[k] + im[k] * im[k]) * escala
+        return amplitud
+
+
+_zooms = {}
+
+def zoom_fft(fs, f_inicio, f_fin, N=256):
+    """Devuelve el motor de zoom para la banda, creándolo solo la primera vez."""
+    clave = (fs, f_inicio, f_fin, N)
+    z = _zooms.get(clave)
+    if z is None:
+        z = ZoomFFT(fs, f_inicio, f_fin, N)
+        _zooms[clave] = z
+    return z
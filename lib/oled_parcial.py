@@ -0,0 +1,78 @@
+# Capa de dibujo sobre ssd1306.SSD1306_I2C con actualización parcial.
+# Copiar a /lib en el ESP32 junto con ssd1306.py.
+
+import ssd1306
+
+SET_COL_ADDR = 0x21
+SET_PAGE_ADDR = 0x22
+
+
+class OLEDParcial(ssd1306.SSD1306_I2C):
+    """
+    Igual que SSD1306_I2C, pero show_parcial() compara el framebuffer con
+    lo último que se envió y, por cada página (8 filas), manda por I2C solo
+    el rango de columnas que cambió. Un espectro que casi no cambia entre
+    cuadros transfiere unos pocos bytes en lugar de los 512 del show().
+    En pantallas de menos de 128 columnas usa el mismo corrimiento que el
+    driver (el controlador tiene 128 columnas y el panel ocupa las del centro).
+    """
+    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
+        self.enviado = None  # el driver ya llama a show() dentro de su __init__
+        super().__init__(width, height, i2c, addr, external_vcc)
+        self.enviado = bytearray(len(self.buffer))  # copia de lo que tiene la pantalla
+        # primera columna del controlador, como en show() del driver: los paneles
+        # angostos quedan centrados en las 128 columnas
+        self.col0 = (128 - width) // 2 if width != 128 else 0
+        self.vista = memoryview(self.buffer)
+        self.completo = True  # el primer cuadro se manda entero
+        self.bytes_enviados = 0
+
+    def show(self):
+        super().show()
+        if self.enviado is None:
+            return
+        self.enviado[:] = self.buffer
+        self.completo = False
+        self.bytes_enviados = len(self.buffer)
+
+    def show_parcial(self):
+        """Envía solo las columnas modificadas de cada página."""
+        if self.completo:
+            self.show()
+            return
+        buf = self.buffer
+        enviado = self.enviado
+        ancho = self.width
+        total = 0
+        for pagina in range(self.pages):
+            inicio = pagina * ancho
+            fin = inicio + ancho
+            a = inicio
+            while a < fin and buf[a] == enviado[a]:
+                a += 1
+            if a == fin:
+                continue  # página sin cambios
+            b = fin - 1
+            while buf[b] == enviado[b]:
+                b -= 1
+            self.write_cmd(SET_COL_ADDR)
+            self.write_cmd(self.col0 + a - inicio)
+            self.write_cmd(self.col0 + b - inicio)
+            self.write_cmd(SET_PAGE_ADDR)
+            self.write_cmd(pagina)
+            self.write_cmd(pagina)
+            self.write_data(self.vista[a:b + 1])
+            enviado[a:b + 1] = self.vista[a:b + 1]
+            total += b + 1 - a
+        self.bytes_enviados = total
+
+    def barra(self, x, alto, ancho=1, base=None, c=1):
+        """Barra vertical de 'alto' pixeles apoyada en la fila 'base' (por defecto la última)."""
+        if base is None:
+            base = self.height - 1
+        if alto <= 0:
+            return
+        if ancho == 1:
+            self.vline(x, base - alto + 1, alto, c)
+        else:
+            self.fill_rect(x, base - alto + 1, ancho, alto, c)
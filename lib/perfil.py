@@ -0,0 +1,185 @@
+# Perfilado por etapas con time.ticks_us para los loops de los prácticos.
+# Copiar a /lib en el ESP32.
+
+import time
+from array import array
+
+
+class Perfil:
+    """
+    Mide cuánto tarda cada etapa de un cuadro (adquisición, FFT, dibujo...)
+    y guarda los últimos 'capacidad' cuadros en un buffer circular fijo
+    (array, sin asignar memoria por cuadro). La última columna es el total
+    del cuadro: la suma de las etapas medidas.
+
+        perfil = crear(("adq", "fft", "oled"), activo=True)
+        perfil.inicio()
+        ...                 # adquisición
+        perfil.marca(0)     # tiempo desde la marca anterior -> etapa 0
+        ...
+        perfil.fin()
+
+    Una etapa que no se ejecutó en el cuadro no se cuenta en sus
+    estadísticas. descartar() mueve la referencia sin medir (esperas
+    intencionales como time.sleep).
+    """
+    def __init__(self, etapas, capacidad=64):
+        self.etapas = tuple(etapas)
+        self.n = len(self.etapas) + 1
+        self.capacidad = capacidad
+        self.datos = array('l', [-1] * (capacidad * self.n))
+        self.actual = array('l', [-1] * self.n)
+        self.pos = 0
+        self.cuadros = 0
+        self.t = 0
+
+    def inicio(self):
+        actual = self.actual
+        for i in range(self.n):
+            actual[i] = -1
+        self.t = time.ticks_us()
+
+    def marca(self, etapa):
+        ahora = time.ticks_us()
+        d = time.ticks_diff(ahora, self.t)
+        if self.actual[etapa] < 0:
+            self.actual[etapa] = d
+        else:
+            self.actual[etapa] += d  # la misma etapa dos veces en el cuadro se suma
+        self.t = ahora
+
+    def descartar(self):
+        self.t = time.ticks_us()
+
+    def fin(self):
+        n = self.n
+        actual = self.actual
+        datos = self.datos
+        base = self.pos * n
+        total = 0
+        for i in range(n - 1):
+            v = actual[i]
+            datos[base + i] = v
+            if v > 0:
+                total += v
+        datos[base + n - 1] = total
+        self.pos += 1
+        if self.pos == self.capacidad:
+            self.pos = 0
+        self.cuadros += 1
+
+    def ultimo(self, etapa):
+        """Duración en us de una etapa en el último cuadro (-1 si no se ejecutó)."""
+        if self.cuadros == 0:
+            return -1
+        return self.datos[((self.pos - 1) % self.capacidad) * self.n + etapa]
+
+    def estadisticas(self, etapa):
+        """(mínimo, media, máximo, p95) en us de una etapa (len(etapas) = total), o None."""
+        n = self.n
+        valores = []
+        for j in range(min(self.cuadros, self.capacidad)):
+            v = self.datos[j * n + etapa]
+            if v >= 0:
+                valores.append(v)
+        if not valores:
+            return None
+        valores.sort()
+        L = len(valores)
+        p95 = valores[(95 * L + 99) // 100 - 1]  # rango más cercano
+        return valores[0], sum(valores) // L, valores[-1], p95
+
+    def reporte(self):
+        """Imprime la tabla de estadísticas por la consola serie."""
+        print("cuadros: %d (estadística de los últimos %d), en us" % (
+            self.cuadros, min(self.cuadros, self.capacidad)))
+        print("%-8s %8s %8s %8s %8s" % ("etapa", "min", "media", "max", "p95"))
+        for i, nombre in enumerate(self.etapas + ("total",)):
+            e = self.estadisticas(i)
+            if e is None:
+                print("%-8s %8s" % (nombre, "-"))
+            else:
+                print("%-8s %8d %8d %8d %8d" % ((nombre,) + e))
+
+    def dibujar(self, oled, y=0):
+        """
+        Overlay compacto del último cuadro: el total en ms arriba a la
+        derecha y debajo una barra de 1 px con un segmento por etapa,
+        proporcional a su duración.
+        """
+        if self.cuadros == 0:
+            return
+        n = self.n
+        base = ((self.pos - 1) % self.capacidad) * n
+        total = self.datos[base + n - 1]
+        if total <= 0:
+            return
+        texto = "%dms" % (total // 1000)
+        x = oled.width - 8 * len(texto)
+        oled.fill_rect(x, y, 8 * len(texto), 8, 0)
+        oled.text(texto, x, y, 1)
+        fila = y + 8
+        oled.hline(0, fila, oled.width, 0)
+        x = 0
+        for i in range(n - 1):
+            v = self.datos[base + i]
+            if v > 0:
+                w = v * oled.width // total
+                if w > 1:
+                    oled.hline(x, fila, w - 1, 1)  # el pixel libre separa las etapas
+                x += w
+
+
+class _PerfilNulo:
+    # Mismos métodos sin hacer nada: con el perfil apagado cada marca cuesta una llamada vacía
+    cuadros = 0
+
+    def inicio(self):
+        pass
+
+    def marca(self, etapa):
+        pass
+
+    def descartar(self):
+        pass
+
+    def fin(self):
+        pass
+
+    def ultimo(self, etapa):
+        return -1
+
+    def estadisticas(self, etapa):
+        return None
+
+    def reporte(self):
+        print("perfil desactivado")
+
+    def dibujar(self, oled, y=0):
+        pass
+
+
+def crear(etapas, activo=True, capacidad=64):
+    """Devuelve un Perfil, o uno que no mide nada si activo es False."""
+    if activo:
+        return Perfil(etapas, capacidad)
+    return _PerfilNulo()
+
+
+_poll = None
+
+def pedido_serial():
+    """True si llegó un carácter por la consola serie (lo consume), sin bloquear."""
+    global _poll
+    import sys
+    if _poll is None:
+        try:
+            import select
+        except ImportError:
+            import uselect as select
+        _poll = select.poll()
+        _poll.register(sys.stdin, select.POLLIN)
+    if _poll.poll(0):
+        sys.stdin.read(1)
+        return True
+    return False
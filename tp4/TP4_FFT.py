@@ -1,51 +1,121 @@
-from machine import ADC, Pin, I2C
-import ssd1306
+from machine import ADC, Pin, I2C, Timer
+from oled_parcial import OLEDParcial
+from perfil import crear as crear_perfil, pedido_serial
 import time
 import math
+import gc
+from array import array
 
-# --- FFT iterativa radix-2 ---
-def bit_reverse(x, bits):
-    result = 0
-    for i in range(bits):
-        if x & (1 << i):
-            result |= 1 << (bits - 1 - i)
-    return result
-
-def fft_iter(x):
-    N = len(x)
-    bits = int(math.log2(N))
-
-    X = [0]*N
-    for i in range(N):
-        j = bit_reverse(i, bits)
-        X[j] = complex(x[i], 0)
-
-    size = 2
-    while size <= N:
-        half = size // 2
-        phase_step = -2j * math.pi / size
-        for i in range(0, N, size):
-            for j in range(half):
-                angle = j * phase_step
-                twiddle = complex(math.cos(angle.imag), math.sin(angle.imag))
-                a = X[i + j]
-                b = X[i + j + half] * twiddle
-                X[i + j] = a + b
-                X[i + j + half] = a - b
-        size *= 2
-    return X
+# FFT, analizador y detector de tonos del paquete compartido lib/dsp (copiar
+# la carpeta dsp/ a /lib en el ESP32). Si el port tiene emisores nativos, dsp
+# usa los núcleos compilados.
+from dsp.transformada import plan_rfft, PlanFFTQ15
+from dsp.espectro import AnalizadorEspectro
+from dsp.tonos import DetectorTonos
+
+# --- Adquisición por timer con doble buffer ---
+class AdquisicionADC:
+    """
+    Muestrea el ADC desde el callback de un timer de hardware a una
+    frecuencia fija, llenando alternadamente dos buffers preasignados.
+    Mientras el loop principal procesa un buffer (obtener/liberar), el
+    timer sigue llenando el otro. Si el loop tarda más que un buffer, el
+    bloque recién adquirido se descarta (self.desbordes) para no pisar
+    los datos que se están usando.
+    """
+    def __init__(self, adc, n, fs, timer_id=0):
+        self.n = n
+        self.fs = fs
+        self.bufs = (array('H', [0] * n), array('H', [0] * n))
+        self.llenando = 0
+        self.idx = 0
+        self.listo = -1    # buffer completo esperando ser leído
+        self.en_uso = -1   # buffer que tiene el loop principal
+        self.desbordes = 0
+        self.t_bloque = 0
+        self.periodo_bloque_us = 0
+        self._leer = adc.read
+        self._cb = self._muestra  # se guarda el método ligado para no asignar memoria en el IRQ
+        self.timer = Timer(timer_id)
+
+    def iniciar(self):
+        self.t_bloque = time.ticks_us()
+        self.timer.init(freq=self.fs, mode=Timer.PERIODIC, callback=self._cb)
+
+    def detener(self):
+        self.timer.deinit()
+
+    def _muestra(self, t):
+        self.bufs[self.llenando][self.idx] = self._leer()
+        self.idx += 1
+        if self.idx < self.n:
+            return
+        self.idx = 0
+        ahora = time.ticks_us()
+        self.periodo_bloque_us = time.ticks_diff(ahora, self.t_bloque)
+        self.t_bloque = ahora
+        siguiente = self.llenando ^ 1
+        if siguiente == self.en_uso:
+            self.desbordes += 1  # se vuelve a llenar el mismo buffer
+            return
+        self.listo = self.llenando
+        self.llenando = siguiente
+
+    def obtener(self):
+        """Espera a que haya un buffer completo y lo devuelve."""
+        while self.listo < 0:
+            time.sleep_ms(1)
+        self.en_uso = self.listo
+        self.listo = -1
+        return self.bufs[self.en_uso]
+
+    def liberar(self):
+        """Devuelve el buffer al timer cuando el loop terminó de usarlo."""
+        self.en_uso = -1
+
+    def frecuencia_muestreo(self):
+        """Frecuencia real medida con el tiempo del último bloque (o la nominal al comienzo)."""
+        if self.periodo_bloque_us <= 0:
+            return self.fs
+        return self.n * 1000000 / self.periodo_bloque_us
 
 # --- Inicialización ---
 i2c = I2C(0, scl=Pin(9), sda=Pin(8))
-oled = ssd1306.SSD1306_I2C(128, 32, i2c)
+oled = OLEDParcial(128, 32, i2c)
 
 adc = ADC(Pin(1))
 adc.atten(ADC.ATTN_11DB)
 adc.width(ADC.WIDTH_12BIT)
 
 N_TOTAL = 512
+N_FFT = 128      # puntos de la FFT (potencia de 2, <= N_TOTAL)
 ZOOM = 4
-DELAY = 0.0008
+FS_ADC = 1000    # frecuencia de muestreo del timer (Hz)
+USAR_Q15 = False  # True: FFT entera en punto fijo, False: FFT real en float
+
+# Modo de trabajo (uno solo):
+#   "osciloscopio": alterna forma de onda y FFT
+#   "analizador":   espectro continuo (Welch + promedios), a FS_ADC
+#   "tonos":        solo sigue las frecuencias de TONOS (filtros de Goertzel, sin FFT), a FS_TONOS
+MODO = "osciloscopio"
+
+SOLAPE = 0.5             # solape entre cuadros del analizador (cuadros nuevos/s = FS_ADC / (N_FFT * (1 - SOLAPE)))
+ALFA_PROMEDIO = 0.25     # peso del cuadro nuevo en el promedio exponencial
+CAIDA_PICO = 0.95        # factor de caída por cuadro del retenedor de pico
+FPS_OBJETIVO = 15        # cuadros por segundo en pantalla
+
+TONOS = (50, 100, 150, 1000)  # Hz: red eléctrica, sus armónicos y un tono de prueba (hasta 4 en pantalla)
+# fs del timer en modo tonos (sin FFT se puede muestrear más rápido). El callback del
+# Timer es Python agendado (soft IRQ): por encima de unos 5 kHz las llamadas se
+# acumulan y se pierden muestras (ver el contador de desbordes); 4 kHz es el máximo
+# recomendado, y tiene que ser > 2 * max(TONOS).
+FS_TONOS = 4000
+N_TONOS = 400            # muestras por medición: ancho de cada filtro FS_TONOS / N_TONOS = 10 Hz
+IMPRIMIR_TONOS_CADA = 5  # mediciones entre cada línea impresa por consola serie
+MEDIR_MEMORIA = False    # True: imprime los bytes asignados en cada cuadro (gc.mem_alloc)
+PERFIL = False           # True: mide cuánto tarda cada etapa del cuadro (time.ticks_us)
+PERFIL_OLED = False      # True: muestra el tiempo del último cuadro sobre la pantalla
+REPORTE_CADA = 0         # imprime el perfil cada tantos cuadros (0: solo al tocar una tecla en la consola)
 
 # --- Carátula inicial ---
 oled.fill(0)
@@ -60,27 +130,154 @@ oled.show()
 time.sleep(1)
 
 # --- Loop principal ---
+plan = plan_rfft(N_FFT)
+plan_q15 = PlanFFTQ15(N_FFT) if USAR_Q15 else None
 modo_fft = False
 ultimo_cambio = time.ticks_ms()
 
-while True:
-    # Adquirir muestras
-    raw = []
-    for _ in range(N_TOTAL):
-        raw.append(adc.read())
-        time.sleep(DELAY)
-     # Calcular promedio para eliminar componente DC
-    promedio = sum(raw[:128]) / 128
-    raw_dc = [v - promedio for v in raw[:128]]
-    
-     # Escalar y reducir cantidad de muestras para mostrar
-    display_samples = []
-    for i in range(0, len(raw), ZOOM):
-        v = raw[i]
-        y = 31 - int(v / 4095 * 31)  # escalar a 0–31
-        display_samples.append(y)
-    
+# En modo analizador se adquiere de a un salto del analizador (N_FFT * (1 - SOLAPE)
+# muestras) en lugar de N_TOTAL: cada bloque que llega completa un cuadro nuevo,
+# FS_ADC / salto por segundo (1000 / 64 = 15.6 con los valores de arriba). Con
+# bloques de N_TOTAL = 512 llegarían menos de 2 por segundo y la pantalla
+# redibujaría el mismo espectro.
+N_ADQ_ANALIZADOR = max(1, int(N_FFT * (1 - SOLAPE)))
+if MODO == "tonos":
+    adquisicion = AdquisicionADC(adc, N_TOTAL, FS_TONOS)
+elif MODO == "analizador":
+    adquisicion = AdquisicionADC(adc, N_ADQ_ANALIZADOR, FS_ADC)
+elif MODO == "osciloscopio":
+    adquisicion = AdquisicionADC(adc, N_TOTAL, FS_ADC)
+else:
+    raise ValueError("MODO desconocido: " + str(MODO))
+adquisicion.iniciar()
+
+# Etapas del perfil (índices para perfil.marca)
+E_ADQ = 0
+E_DC = 1
+E_FFT = 2
+E_DIBUJO = 3
+E_ENVIO = 4
+perfil = crear_perfil(("adq", "dc", "fft", "dibujo", "envio"), activo=PERFIL)
+
+def reportar_perfil():
+    # Por consola serie: a pedido (cualquier tecla) o cada REPORTE_CADA cuadros
+    if not PERFIL:
+        return
+    if (REPORTE_CADA and perfil.cuadros % REPORTE_CADA == 0) or pedido_serial():
+        perfil.reporte()
+
+def dibujar_analizador(analizador):
+    # Barras = promedio, punto = pico retenido; escala en amplitud (raíz de la potencia)
+    promedio = analizador.promedio
+    pico = analizador.pico
+    referencia = max(pico)
+    if referencia == 0:
+        referencia = 1
     oled.fill(0)
+    for k in range(min(64, len(promedio) - 1)):
+        h = int(math.sqrt(promedio[k] / referencia) * 31)
+        hp = int(math.sqrt(pico[k] / referencia) * 31)
+        oled.barra(2 * k, h)
+        oled.pixel(2 * k, 31 - hp, 1)
+
+def correr_analizador():
+    # Procesa todos los buffers que llegan; la pantalla se actualiza a FPS_OBJETIVO
+    analizador = AnalizadorEspectro(N_FFT, SOLAPE, ALFA_PROMEDIO, CAIDA_PICO)
+    periodo_ms = 1000 // FPS_OBJETIVO
+    if FS_ADC / analizador.salto < FPS_OBJETIVO:
+        print("Aviso: la adquisición da %.1f cuadros/s, menos que FPS_OBJETIVO (subir SOLAPE o FS_ADC)" % (
+            FS_ADC / analizador.salto))
+    proximo = time.ticks_ms()
+    mem_inicio = gc.mem_alloc()
+    while True:
+        perfil.inicio()
+        raw = adquisicion.obtener()
+        perfil.marca(E_ADQ)
+        analizador.agregar(raw)
+        adquisicion.liberar()
+        perfil.marca(E_FFT)
+
+        ahora = time.ticks_ms()
+        if time.ticks_diff(ahora, proximo) >= 0:
+            proximo = time.ticks_add(proximo, periodo_ms)
+            if time.ticks_diff(ahora, proximo) >= 0:
+                proximo = time.ticks_add(ahora, periodo_ms)  # atrasado: no acumular cuadros
+            dibujar_analizador(analizador)
+            perfil.marca(E_DIBUJO)
+            if PERFIL_OLED:
+                perfil.dibujar(oled)
+            oled.show_parcial()
+            perfil.marca(E_ENVIO)
+            if MEDIR_MEMORIA:
+                print("alloc/cuadro:", gc.mem_alloc() - mem_inicio)
+                mem_inicio = gc.mem_alloc()
+        perfil.fin()
+        reportar_perfil()
+
+if MODO == "analizador":
+    correr_analizador()
+
+def dibujar_tonos(detector):
+    # Una fila de 8 px por tono: frecuencia y barra de nivel entre -60 y 0 dBFS
+    oled.fill(0)
+    for j in range(min(4, len(detector.frecuencias))):
+        y = 8 * j
+        oled.text("%4d" % detector.frecuencias[j], 0, y)
+        largo = int((detector.nivel_db(j) + 60) * 94 / 60)
+        if largo > 0:
+            oled.fill_rect(34, y + 1, min(largo, 94), 6, 1)
+
+def correr_tonos():
+    # Cada muestra pasa por el banco de Goertzel; pantalla y consola se actualizan por medición
+    detector = DetectorTonos(TONOS, FS_TONOS, N_TONOS)
+    impresos = 0
+    while True:
+        perfil.inicio()
+        raw = adquisicion.obtener()
+        perfil.marca(E_ADQ)
+        nuevos = detector.agregar(raw)
+        adquisicion.liberar()
+        perfil.marca(E_FFT)
+        if nuevos:
+            dibujar_tonos(detector)
+            perfil.marca(E_DIBUJO)
+            if PERFIL_OLED:
+                perfil.dibujar(oled)
+            oled.show_parcial()
+            perfil.marca(E_ENVIO)
+            if detector.bloques - impresos >= IMPRIMIR_TONOS_CADA:
+                impresos = detector.bloques
+                print("  ".join("%dHz %.1fdB" % (TONOS[j], detector.nivel_db(j)) for j in range(len(TONOS))))
+        perfil.fin()
+        reportar_perfil()
+
+if MODO == "tonos":
+    correr_tonos()
+
+# Buffers preasignados que se reutilizan cuadro a cuadro (sin listas nuevas en el loop)
+raw_dc = array('f', [0] * N_FFT)
+display_samples = array('B', [0] * (N_TOTAL // ZOOM))
+mag = array('f', [0] * (N_FFT // 2))
+# Etiqueta del pico: el string solo se arma de nuevo cuando cambia el bin
+k_etiqueta = -1
+etiqueta_pico = ""
+
+while True:
+    if MEDIR_MEMORIA:
+        mem_inicio = gc.mem_alloc()
+
+    # Tomar el último buffer completo (el timer ya está llenando el otro)
+    perfil.inicio()
+    raw = adquisicion.obtener()
+    perfil.marca(E_ADQ)
+     # Calcular promedio para eliminar componente DC (in-place, sin slices)
+    suma = 0
+    for i in range(N_FFT):
+        suma += raw[i]
+    promedio = suma / N_FFT
+    for i in range(N_FFT):
+        raw_dc[i] = raw[i] - promedio
+    perfil.marca(E_DC)
 
     # Cambiar modo cada 1 segundo
     if time.ticks_diff(time.ticks_ms(), ultimo_cambio) > 3000:
@@ -90,32 +287,69 @@ while True:
     if not modo_fft:
         # Modo temporal
         #oled.text("Tiempo", 0, 0)
-        display_samples = []
-        for i in range(0, len(raw), ZOOM):
-            y = 31 - int(raw[i] / 4095 * 31)
-            display_samples.append(y)
+         # Escalar y reducir cantidad de muestras para mostrar
+        oled.fill(0)
+        for x in range(len(display_samples)):
+            display_samples[x] = 31 - (raw[x * ZOOM] * 31) // 4095  # escalar a 0–31
         for x in range(min(128, len(display_samples))):
             oled.pixel(x, display_samples[x], 1)
+        perfil.marca(E_DIBUJO)
         time.sleep(0.1)
+        perfil.descartar()  # la pausa no es parte del cuadro
 
     else:
         # Modo frecuencia (FFT)
         # oled.text("Frecuencia", 0, 0)
 
-        fft_data = fft_iter(raw_dc)  # Usamos 128 puntos
-        mag = [abs(c) for c in fft_data[:64]]  # Solo mitad (simétrica)
-        max_mag = max(mag) if max(mag) != 0 else 1
+        if USAR_Q15:
+            # FFT entera: muestras de 12 bits sin DC, sin floats en el núcleo
+            promedio_q = suma // N_FFT
+            re = plan_q15.re
+            im = plan_q15.im
+            for i in range(N_FFT):
+                re[i] = raw[i] - promedio_q
+                im[i] = 0
+            plan_q15.ejecutar(re, im)
+            for k in range(N_FFT // 2):
+                mag[k] = plan_q15.magnitud(k)
+        else:
+            # FFT real con el plan (N/2 puntos complejos + separación)
+            plan.ejecutar(raw_dc)
+            re = plan.re
+            im = plan.im
+            for k in range(N_FFT // 2):  # Solo mitad (simétrica)
+                mag[k] = math.sqrt(re[k] * re[k] + im[k] * im[k])
+
+        # Máximo y bin del pico en una pasada
+        k_pico = 0
+        for k in range(1, N_FFT // 2):
+            if mag[k] > mag[k_pico]:
+                k_pico = k
+        max_mag = mag[k_pico] if mag[k_pico] != 0 else 1
+        perfil.marca(E_FFT)
 
-        # Mostramos espectro simétrico
-        for x in range(64):
+        # Eje de frecuencia real: bin k corresponde a k * fs / N_FFT Hz
+        fs_real = adquisicion.frecuencia_muestreo()
+
+        # Mostramos espectro simétrico (barras de 2 px con fill_rect)
+        oled.fill(0)
+        for x in range(min(64, len(mag))):
             h = int(mag[x] / max_mag * 31)
-            for y in range(h):
-                # Parte derecha (original)
-                oled.pixel(64 + x*4,     31 - y, 1)
-                oled.pixel(64 + x*4 + 1, 31 - y, 1)
-        
-                # Parte izquierda (espejo)
-                oled.pixel(63 - x*4,     31 - y, 1)
-                oled.pixel(63 - x*4 - 1, 31 - y, 1)
-
-    oled.show()
+            oled.barra(64 + x*4, h, ancho=2)  # Parte derecha (original)
+            oled.barra(62 - x*4, h, ancho=2)  # Parte izquierda (espejo)
+        if k_pico != k_etiqueta:
+            k_etiqueta = k_pico
+            etiqueta_pico = "%dHz" % int(k_pico * fs_real / N_FFT)
+        oled.text(etiqueta_pico, 0, 0)
+        perfil.marca(E_DIBUJO)
+
+    adquisicion.liberar()
+    if PERFIL_OLED:
+        perfil.dibujar(oled)
+    oled.show_parcial()  # solo las columnas que cambiaron
+    perfil.marca(E_ENVIO)
+    perfil.fin()
+    reportar_perfil()
+
+    if MEDIR_MEMORIA:
+        print("alloc/cuadro:", gc.mem_alloc() - mem_inicio)